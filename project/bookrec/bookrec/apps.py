@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class BookrecConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'bookrec'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .db import apply_sqlite_pragmas
+
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid='bookrec.sqlite_pragmas')
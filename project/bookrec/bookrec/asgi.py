@@ -8,4 +8,11 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bookrec.settings')
 
-application = get_asgi_application()
\ No newline at end of file
+application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.WARMUP_ON_STARTUP:
+    from bookrec.warmup import warmup
+
+    warmup()
@@ -0,0 +1,143 @@
+"""
+Resized variants for uploaded images (book covers, avatars).
+
+Each source image is read once and rendered into every size in
+``settings.IMAGE_VARIANTS`` and every format in ``settings.IMAGE_VARIANT_FORMATS``
+on a shared thread pool (Pillow releases the GIL while resizing and
+encoding). Variant names embed a hash of the source bytes and the width and
+quality they were rendered with, so a URL never changes meaning and can be
+cached forever. The stored mapping also records a fingerprint of the variant
+settings, so changing them marks existing variants as stale.
+"""
+import hashlib
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+EXTENSIONS = {
+    'webp': 'webp',
+    'jpeg': 'jpg',
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_WORKERS, thread_name_prefix='image-variants'
+            )
+        return _executor
+
+
+def settings_fingerprint():
+    """Short hash of the settings that decide which variants exist and how they look."""
+    params = (
+        sorted(settings.IMAGE_VARIANTS.items()),
+        list(settings.IMAGE_VARIANT_FORMATS),
+        settings.IMAGE_VARIANT_QUALITY,
+    )
+    return hashlib.sha256(repr(params).encode()).hexdigest()[:8]
+
+
+def render_variant(data, width, fmt, quality):
+    """Resize encoded image ``data`` to at most ``width`` pixels wide and encode as ``fmt``."""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as image:
+        # Let the JPEG decoder downscale while decoding instead of after.
+        image.draft('RGB', (width, width * 4))
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        if fmt == 'jpeg' and image.mode != 'RGB':
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image.convert('RGBA'), mask=image.convert('RGBA').getchannel('A'))
+            image = background
+        elif image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        out = io.BytesIO()
+        image.save(out, fmt.upper(), quality=quality, optimize=True)
+        return out.getvalue()
+
+
+def generate_variants(field_file, parallel=True):
+    """Render and store all variants of ``field_file``.
+
+    Returns the mapping stored on the model: the source name, its content
+    hash, the settings fingerprint and ``{variant: {format: storage name}}``.
+    """
+    storage = field_file.storage
+    with field_file.open('rb') as source:
+        data = source.read()
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    directory = field_file.name.rsplit('/', 1)[0] if '/' in field_file.name else ''
+    quality = settings.IMAGE_VARIANT_QUALITY
+
+    jobs = {}
+    for variant, width in settings.IMAGE_VARIANTS.items():
+        for fmt in settings.IMAGE_VARIANT_FORMATS:
+            name = f'{directory}/variants/{digest}-{variant}-{width}w-q{quality}.{EXTENSIONS[fmt]}'.lstrip('/')
+            jobs[variant, fmt] = (name, width)
+
+    def store(name, width, fmt):
+        # Content-addressed: an existing file already holds exactly these bytes.
+        if not storage.exists(name):
+            name = storage.save(name, ContentFile(render_variant(data, width, fmt, quality)))
+        return name
+
+    if parallel:
+        executor = get_executor()
+        futures = {key: executor.submit(store, name, width, key[1]) for key, (name, width) in jobs.items()}
+        stored = {key: future.result() for key, future in futures.items()}
+    else:
+        stored = {key: store(name, width, key[1]) for key, (name, width) in jobs.items()}
+
+    variants = {}
+    for (variant, fmt), name in stored.items():
+        variants.setdefault(variant, {})[fmt] = name
+    return {
+        'source': field_file.name,
+        'hash': digest,
+        'fingerprint': settings_fingerprint(),
+        'variants': variants,
+    }
+
+
+def needs_variants(field_file, current):
+    if not field_file:
+        return bool(current)
+    current = current or {}
+    return current.get('source') != field_file.name or current.get('fingerprint') != settings_fingerprint()
+
+
+def refresh_variants(instance, image_field, variants_field, parallel=True):
+    """Regenerate variants if ``image_field`` changed since they were made.
+
+    Saves only the variants column and returns True when anything changed.
+    """
+    field_file = getattr(instance, image_field)
+    current = getattr(instance, variants_field)
+    if not needs_variants(field_file, current):
+        return False
+    variants = generate_variants(field_file, parallel) if field_file else {}
+    setattr(instance, variants_field, variants)
+    type(instance).objects.filter(pk=instance.pk).update(**{variants_field: variants})
+    return True
+
+
+def variant_urls(variants, storage, request=None):
+    """Turn a stored variants mapping into ``{variant: {format: url}}``."""
+    urls = {}
+    for variant, formats in (variants or {}).get('variants', {}).items():
+        urls[variant] = {}
+        for fmt, name in formats.items():
+            url = storage.url(name)
+            urls[variant][fmt] = request.build_absolute_uri(url) if request else url
+    return urls
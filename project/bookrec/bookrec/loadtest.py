@@ -0,0 +1,114 @@
+"""
+Shared harness for the load-generating management commands (``bench_db``,
+``stress_suggest``).
+
+Requests go through DRF's in-process ``APIClient``, one per thread, rather
+than over HTTP. They exercise the middleware, views, throttles, caches and
+database exactly as a worker would, but not a real server's socket handling
+or process model, and all threads share one process's caches.
+"""
+import math
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from recommendations.throttling import unlimited_throttles
+
+
+@contextmanager
+def throwaway_users(prefix, count):
+    """Yield ``count`` users named ``<prefix><n>``; every user with the prefix is deleted afterwards."""
+    try:
+        yield [User.objects.get_or_create(username=f'{prefix}{i}')[0] for i in range(count)]
+    finally:
+        User.objects.filter(username__startswith=prefix).delete()
+
+
+@contextmanager
+def unthrottled():
+    """Accept the test client's host and lift the recommendation rate limits.
+
+    Without this the runs measure the throttles rather than the code behind them.
+    """
+    with override_settings(ALLOWED_HOSTS=['testserver'], RECOMMENDATION_THROTTLES=unlimited_throttles()):
+        yield
+
+
+class RequestLog:
+    """Latency and status of every request, kept per thread and merged at the end."""
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        # Exception class names behind 5xx responses.
+        self.exceptions = Counter()
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def send(self, request, *args, **kwargs):
+        """Call ``request(*args, **kwargs)`` (e.g. ``client.post``), record it and return the response."""
+        started = time.perf_counter()
+        response = request(*args, **kwargs)
+        self.latencies.append(time.perf_counter() - started)
+        self.statuses[response.status_code] += 1
+        if response.status_code >= 500 and getattr(response, 'exc_info', None):
+            self.exceptions[response.exc_info[0].__name__] += 1
+        return response
+
+    def merge(self, other):
+        with self._lock:
+            self.latencies.extend(other.latencies)
+            self.statuses.update(other.statuses)
+            self.exceptions.update(other.exceptions)
+
+    @property
+    def total(self):
+        return len(self.latencies)
+
+    @property
+    def errors(self):
+        return sum(count for status, count in self.statuses.items() if status >= 400)
+
+    def percentile(self, percent):
+        """Nearest-rank percentile latency in seconds."""
+        latencies = sorted(self.latencies)
+        return latencies[max(math.ceil(len(latencies) * percent / 100) - 1, 0)]
+
+    def write_summary(self, stdout, percentiles=(50, 95)):
+        stdout.write(f"requests:   {self.total} in {self.elapsed:.2f}s ({self.total / self.elapsed:.1f} req/s)")
+        stdout.write(f"statuses:   {dict(sorted(self.statuses.items()))}")
+        for percent in percentiles:
+            stdout.write(f"{f'p{percent}:':<12}{self.percentile(percent) * 1000:.1f} ms")
+
+
+def run_clients(threads, work, log, together=False):
+    """Run ``work(index, client, local_log)`` on ``threads`` threads and merge their logs into ``log``.
+
+    Each thread gets its own ``APIClient`` and ``RequestLog`` and closes its
+    database connections when done. With ``together`` the threads wait for
+    each other before starting, so their first requests really overlap.
+    """
+    start = threading.Barrier(threads) if together else None
+
+    def run(index):
+        client = APIClient(raise_request_exception=False)
+        local = RequestLog()
+        try:
+            if start:
+                start.wait()
+            work(index, client, local)
+        finally:
+            connections.close_all()
+            log.merge(local)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(run, range(threads)))
+    log.elapsed = time.perf_counter() - started
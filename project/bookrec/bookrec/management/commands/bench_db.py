@@ -0,0 +1,61 @@
+import random
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from bookrec.loadtest import RequestLog, run_clients, throwaway_users, unthrottled
+from books.models import Book
+
+BENCH_USER_PREFIX = 'bench-db-'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure request throughput under concurrent /suggest/ calls and interaction writes, "
+        "sent through the in-process test client rather than over HTTP. Run it once per "
+        "settings module (e.g. --settings=bookrec.settings_production) to compare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=50, help="Requests per thread")
+        parser.add_argument(
+            '--write-ratio', type=float, default=0.5,
+            help="Fraction of requests that log an interaction instead of calling /suggest/",
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        book_ids = list(Book.objects.values_list('id', flat=True))
+        if not book_ids:
+            raise CommandError("No books found; load data first (python initial_data.py).")
+
+        moods = [choice for choice, _ in Book.MOOD_CHOICES]
+        log = RequestLog()
+
+        self.stdout.write(
+            f"{settings.DATABASES['default']['ENGINE']} "
+            f"(CONN_MAX_AGE={settings.DATABASES['default'].get('CONN_MAX_AGE', 0)}, "
+            f"pragmas={getattr(settings, 'SQLITE_PRAGMAS', None)})"
+        )
+        with throwaway_users(BENCH_USER_PREFIX, options['threads']) as users, unthrottled():
+
+            def work(index, client, local):
+                rng = random.Random(options['seed'] + index)
+                client.force_authenticate(users[index])
+                for _ in range(options['requests']):
+                    if rng.random() < options['write_ratio']:
+                        local.send(client.post, '/api/recommendations/interactions/', {
+                            'book': rng.choice(book_ids),
+                            'interaction_type': rng.choice(['view', 'save', 'like']),
+                        }, format='json')
+                    else:
+                        local.send(client.post, '/api/recommendations/suggest/', {
+                            'mood': rng.choice(moods),
+                            'intensity': rng.randint(1, 10),
+                        }, format='json')
+
+            run_clients(options['threads'], work, log)
+
+        log.write_summary(self.stdout)
+        self.stdout.write(f"errors:     {log.errors}")
@@ -0,0 +1,70 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter so each measurement starts from a cold import state.
+PROBE = r"""
+import json, os, resource, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urlconf = time.perf_counter()
+cold_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+cold_modules = len(sys.modules)
+from django.conf import settings
+if settings.WARMUP_ON_STARTUP:
+    from bookrec.warmup import warmup
+    warmup()
+warm = time.perf_counter()
+print(json.dumps({
+    'setup_ms': (setup - started) * 1000,
+    'urlconf_ms': (urlconf - setup) * 1000,
+    'warmup_ms': (warm - urlconf) * 1000,
+    'cold_maxrss_mb': cold_rss / 1024,
+    'cold_modules': cold_modules,
+    'maxrss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'modules': len(sys.modules),
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold worker startup time for each settings module, and its peak memory and "
+        "module count both before and after the warmup hooks run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'settings_modules', nargs='*', default=['bookrec.settings', 'bookrec.settings_api'],
+        )
+        parser.add_argument('--runs', type=int, default=3)
+
+    def handle(self, *args, **options):
+        for module in options['settings_modules']:
+            runs = [self.probe(module) for _ in range(options['runs'])]
+            # Report the fastest run; the others mostly measure disk cache noise.
+            best = min(runs, key=lambda run: run['setup_ms'] + run['urlconf_ms'] + run['warmup_ms'])
+            self.stdout.write(
+                f"{module}: setup {best['setup_ms']:.0f} ms, urlconf {best['urlconf_ms']:.0f} ms, "
+                f"warmup {best['warmup_ms']:.0f} ms; before warmup {best['cold_maxrss_mb']:.1f} MB, "
+                f"{best['cold_modules']} modules; after warmup {best['maxrss_mb']:.1f} MB, "
+                f"{best['modules']} modules"
+            )
+
+    def probe(self, module):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=module)
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE], cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"Startup with {module} failed:\n{result.stderr}")
+        return json.loads(result.stdout.strip().splitlines()[-1])
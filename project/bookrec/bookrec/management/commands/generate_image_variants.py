@@ -0,0 +1,64 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from bookrec.images import needs_variants, refresh_variants
+from books.models import Book
+from users.models import UserProfile
+
+TARGETS = {
+    'covers': (Book, 'cover_image', 'cover_variants'),
+    'avatars': (UserProfile, 'avatar', 'avatar_variants'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate resized variants for existing book covers and avatars, and regenerate "
+        "ones made with different IMAGE_VARIANT* settings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--only', choices=sorted(TARGETS), nargs='+', default=sorted(TARGETS))
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        # At most this many images are read into memory at once.
+        max_in_flight = options['workers'] * 2
+
+        def process(instance, image_field, variants_field):
+            try:
+                return refresh_variants(instance, image_field, variants_field, parallel=False)
+            finally:
+                connections.close_all()
+
+        for target in options['only']:
+            model, image_field, variants_field = TARGETS[target]
+            queryset = model.objects.exclude(**{image_field: ''}).exclude(**{f'{image_field}__isnull': True})
+            done = failed = 0
+            pending = set()
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                for instance in queryset.only('pk', image_field, variants_field).iterator(
+                    chunk_size=options['chunk_size']
+                ):
+                    if not needs_variants(getattr(instance, image_field), getattr(instance, variants_field)):
+                        continue
+                    if len(pending) >= max_in_flight:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        done, failed = self.tally(finished, done, failed)
+                    pending.add(pool.submit(process, instance, image_field, variants_field))
+                done, failed = self.tally(pending, done, failed)
+            self.stdout.write(f"{target}: {done} processed, {failed} failed")
+
+    def tally(self, futures, done, failed):
+        for future in futures:
+            try:
+                future.result()
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"Failed: {exc}")
+            else:
+                done += 1
+        return done, failed
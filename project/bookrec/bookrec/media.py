@@ -0,0 +1,12 @@
+from django.views.static import serve
+
+# Variant files are content-addressed (see bookrec.images), so they never change.
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def serve_media(request, path, document_root=None):
+    """``django.views.static.serve`` with far-future caching for image variants."""
+    response = serve(request, path, document_root=document_root)
+    if '/variants/' in f'/{path}':
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
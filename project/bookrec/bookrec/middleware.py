@@ -0,0 +1,15 @@
+from . import routers
+
+
+class ReplicaPinningMiddleware:
+    """Track writes per request so ``ReplicaRouter`` can pin the user to the primary."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = routers.begin_request(request)
+        try:
+            return self.get_response(request)
+        finally:
+            routers.end_request(token)
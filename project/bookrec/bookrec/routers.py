@@ -0,0 +1,103 @@
+"""
+Primary/replica database routing.
+
+Catalogue reads (the ``books`` app) and recommendation listings go to one of
+``settings.DATABASE_REPLICAS``; everything else, and every write, goes to
+``default``. A user who has just written is pinned to the primary for
+``settings.REPLICA_PIN_SECONDS`` so replication lag can't hide their own
+changes (e.g. ``RecommendationListView`` right after ``/suggest/``).
+"""
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+PRIMARY = 'default'
+
+_request_state = contextvars.ContextVar('bookrec_db_request_state', default=None)
+_force_primary = contextvars.ContextVar('bookrec_db_force_primary', default=False)
+
+
+class RequestState:
+    def __init__(self, request):
+        self.request = request
+        self.wrote = False
+        self.pinned = None
+
+
+def pin_cache_key(user_id):
+    return f'db-pin:{user_id}'
+
+
+def begin_request(request):
+    return _request_state.set(RequestState(request))
+
+
+def end_request(token):
+    """Pin the requesting user to the primary if the request wrote anything."""
+    state = _request_state.get()
+    _request_state.reset(token)
+    if state is None or not state.wrote:
+        return
+    user = getattr(state.request, 'user', None)
+    if user is not None and user.is_authenticated:
+        cache.set(pin_cache_key(user.pk), True, settings.REPLICA_PIN_SECONDS)
+
+
+@contextmanager
+def use_primary():
+    """Send all reads inside the block to the primary."""
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+
+def should_use_primary():
+    if _force_primary.get():
+        return True
+    state = _request_state.get()
+    if state is None:
+        return False
+    if state.wrote:
+        return True
+    if state.pinned is None:
+        user = getattr(state.request, 'user', None)
+        if user is None or not user.is_authenticated:
+            # Authentication may not have run yet, so don't remember the answer.
+            return False
+        state.pinned = cache.get(pin_cache_key(user.pk)) is not None
+    return state.pinned
+
+
+class ReplicaRouter:
+    route_app_labels = {'books'}
+    route_models = {('recommendations', 'recommendation')}
+
+    def _is_routed(self, model):
+        meta = model._meta
+        return meta.app_label in self.route_app_labels or (meta.app_label, meta.model_name) in self.route_models
+
+    def db_for_read(self, model, **hints):
+        if not self._is_routed(model):
+            return None
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or should_use_primary():
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
@@ -20,7 +20,9 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'rest_framework.authtoken',
     'corsheaders',
+    'bookrec',
     'books',
     'recommendations',
     'users',
@@ -98,11 +100,127 @@ CORS_ALLOW_ALL_ORIGINS = True
 
 # REST Framework settings
 REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'users.authentication.CachedTokenAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ]
 }
 
+# Per-process token -> user/profile/preference cache used by
+# users.authentication.CachedTokenAuthentication.
+AUTH_TOKEN_CACHE_SIZE = 10000
+AUTH_TOKEN_CACHE_TTL = 60  # seconds
+
+# Startup
+# Callables run by bookrec.warmup.warmup() before a worker serves traffic
+# (wsgi.py calls it when WARMUP_ON_STARTUP is set).
+WARMUP_ON_STARTUP = False
+WARMUP_HOOKS = [
+    'recommendations.catalogue.get_catalogue_index',
+]
+
 # Media files
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Resized copies generated for cover_image and avatar uploads: name -> max width.
+IMAGE_VARIANTS = {
+    'thumb': 160,
+    'card': 360,
+    'detail': 720,
+}
+IMAGE_VARIANT_FORMATS = ['webp', 'jpeg']
+IMAGE_VARIANT_QUALITY = 82
+IMAGE_WORKERS = 4
+
+# Recommendation regeneration queue
+# Seconds to wait after the last preference/interaction change before
+# recomputing, so bursts of edits coalesce into one job. A job never waits
+# longer than RECOMMENDATION_REGEN_MAX_DELAY seconds after it was first queued.
+RECOMMENDATION_REGEN_DELAY = 30
+RECOMMENDATION_REGEN_MAX_DELAY = 300
+RECOMMENDATION_TASK_LEASE = 300
+RECOMMENDATION_TASK_MAX_ATTEMPTS = 3
+
+# Book engagement stats
+BOOK_TRENDING_HALF_LIFE = 72  # hours
+BOOK_TRENDING_WEIGHTS = {
+    'view': 1,
+    'save': 3,
+    'read': 4,
+    'like': 5,
+    'dislike': -2,
+    'rate': 2,
+}
+BOOK_STATS_BATCH_SIZE = 5000
+# Interactions younger than this many seconds are left for the next batch so
+# transactions that commit out of id order aren't skipped.
+BOOK_STATS_GRACE_SECONDS = 5
+
+# Seconds a user's read/disliked book set stays cached between rebuilds. The
+# default cache is per process, so this also bounds how long other workers can
+# keep recommending a book the user has just read; settings_production raises
+# it when a shared cache is configured.
+RECOMMENDATION_EXCLUSION_CACHE_TIMEOUT = 30
+
+# Mood analytics
+MOOD_SUMMARY_RECENT = 20  # entries kept in the last-N window
+MOOD_RETENTION_DAYS = 90  # raw UserMood rows older than this are rolled into daily buckets
+
+# Recommendation scoring
+# Each profile holds recommendations.scoring.WeightProfile fields; clients may
+# pick one by name with the "profile" field on /suggest/. "popularity" weights
+# the normalised trending score (0 = off).
+RECOMMENDATION_WEIGHT_PROFILE = 'default'
+RECOMMENDATION_WEIGHT_PROFILES = {
+    'default': {
+        'base': 50,
+        'mood': 20,
+        'personality': 15,
+        'complexity': 10,
+        'liked': 5,
+        'popularity': 0,
+        'intensity_gain': 0.5,
+    },
+    'trending': {
+        'base': 50,
+        'mood': 20,
+        'personality': 10,
+        'complexity': 5,
+        'liked': 5,
+        'popularity': 15,
+        'intensity_gain': 0.5,
+    },
+}
+
+# Diversity re-ranking
+# /suggest/ re-ranks the RECOMMENDATION_DIVERSITY_POOL best candidates with
+# MMR when called with diversity between 0 (off) and 1.
+RECOMMENDATION_DIVERSITY_POOL = 500
+RECOMMENDATION_DEFAULT_DIVERSITY = 0
+RECOMMENDATION_DIVERSITY_FEATURE_WEIGHTS = {
+    'genre': 0.4,
+    'author': 0.35,
+    'theme': 0.25,
+}
+
+# Token-bucket budgets (burst capacity, sustained refill rate) per endpoint.
+# Exceeding the per-user bucket returns 429; when the endpoint-wide bucket is
+# empty /suggest/ sheds load by serving stored recommendations.
+RECOMMENDATION_THROTTLES = {
+    'suggest': {
+        'user': {'capacity': 10, 'refill_per_second': 0.5},
+        'endpoint': {'capacity': 100, 'refill_per_second': 50},
+    },
+}
+
+# Batch suggestions
+# POST /api/recommendations/suggest/batch/ (staff only) and `manage.py
+# suggest_batch` accept at most RECOMMENDATION_BATCH_MAX_ITEMS (user, mood)
+# pairs per request and process them RECOMMENDATION_BATCH_CHUNK_SIZE at a time.
+RECOMMENDATION_BATCH_MAX_ITEMS = 10000
+RECOMMENDATION_BATCH_CHUNK_SIZE = 500
@@ -0,0 +1,55 @@
+"""
+API-only settings profile for JSON workers.
+
+Builds on the production settings but leaves out everything a pure API
+worker never uses: admin, sessions, messages, static files, templates and
+(unless DJANGO_ENABLE_CORS is set) CORS handling, so fewer modules are
+imported at startup. Memory is not lower: the resident set before warmup is
+about the same as with the full settings, and the warmup hooks then import
+NumPy and build the catalogue index before the worker takes traffic, which
+an unwarmed worker would otherwise pay for on its first recommendation
+request. ``manage.py bench_startup`` reports both sides of the warmup.
+"""
+from .settings_production import *  # noqa: F401,F403
+from .settings_production import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK, env_bool
+
+UNUSED_APPS = {
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+}
+UNUSED_MIDDLEWARE = {
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+}
+
+if not env_bool('DJANGO_ENABLE_CORS', False):
+    UNUSED_APPS.add('corsheaders')
+    UNUSED_MIDDLEWARE.add('corsheaders.middleware.CorsMiddleware')
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in UNUSED_APPS]
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE if middleware not in UNUSED_MIDDLEWARE]
+
+TEMPLATES = []
+
+REST_FRAMEWORK = dict(
+    REST_FRAMEWORK,
+    DEFAULT_AUTHENTICATION_CLASSES=[
+        'users.authentication.CachedTokenAuthentication',
+    ],
+    DEFAULT_RENDERER_CLASSES=[
+        'rest_framework.renderers.JSONRenderer',
+    ],
+    # The default (browsable API) parsers include form parsing we don't need.
+    DEFAULT_PARSER_CLASSES=[
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    UNAUTHENTICATED_USER=None,
+)
+
+WARMUP_ON_STARTUP = True
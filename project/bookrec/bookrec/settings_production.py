@@ -0,0 +1,115 @@
+"""
+Production settings for bookrec.
+
+Everything environment specific is read from ``DJANGO_*`` / ``DB_*`` variables,
+the rest is inherited from the base settings module.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, MIDDLEWARE, SECRET_KEY
+
+
+def env_bool(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_list(name, default=''):
+    return [item.strip() for item in os.environ.get(name, default).split(',') if item.strip()]
+
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)
+
+DEBUG = env_bool('DJANGO_DEBUG', False)
+
+ALLOWED_HOSTS = env_list('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1')
+
+# Database
+# DB_ENGINE selects the backend ("sqlite" or "postgres"). Connections are kept
+# open between requests for DB_CONN_MAX_AGE seconds instead of being reopened
+# on every request.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 600))
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'bookrec'),
+            'USER': os.environ.get('DB_USER', 'bookrec'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            # Ping persistent connections before reusing them so a server
+            # restart doesn't surface as an error on the next request.
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+            },
+        }
+    }
+elif DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # Seconds a writer waits for the database lock before failing.
+                'timeout': int(os.environ.get('DB_BUSY_TIMEOUT', 20)),
+            },
+        }
+    }
+
+    # Applied to every new connection by bookrec.db.apply_sqlite_pragmas.
+    # WAL lets readers proceed while a write is in progress, which is what
+    # keeps concurrent /suggest/ calls from queueing behind each other.
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('DB_BUSY_TIMEOUT', 20)) * 1000,
+        'mmap_size': int(os.environ.get('DB_MMAP_SIZE', 128 * 1024 * 1024)),
+    }
+else:
+    raise ValueError(f"Unsupported DB_ENGINE {DB_ENGINE!r}; expected 'sqlite' or 'postgres'")
+
+# Read replicas
+# DB_REPLICAS lists one replica per entry: a database file for SQLite (handy
+# for trying the routing locally with two files) or a host for Postgres.
+# Catalogue and recommendation-listing reads are spread across them by
+# bookrec.routers.ReplicaRouter; writes always go to the primary.
+DATABASE_REPLICAS = []
+for index, location in enumerate(env_list('DB_REPLICAS'), start=1):
+    alias = f'replica{index}'
+    replica = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    if DB_ENGINE == 'postgres':
+        replica['HOST'] = location
+    else:
+        replica['NAME'] = location
+    DATABASES[alias] = replica
+    DATABASE_REPLICAS.append(alias)
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['bookrec.routers.ReplicaRouter']
+    MIDDLEWARE = ['bookrec.middleware.ReplicaPinningMiddleware'] + MIDDLEWARE
+
+# Seconds a user's reads stay on the primary after they write something.
+REPLICA_PIN_SECONDS = int(os.environ.get('DB_REPLICA_PIN_SECONDS', 5))
+
+# Cache
+# Replica pinning and other per-user state live in the cache, so workers
+# must share one; REDIS_URL switches from per-process memory to Redis.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+    # Every worker sees the same invalidations, so the sets can live longer.
+    RECOMMENDATION_EXCLUSION_CACHE_TIMEOUT = 24 * 3600
@@ -1,14 +1,19 @@
-from django.contrib import admin
+from django.apps import apps
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from bookrec.media import serve_media
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('api/books/', include('books.urls')),
     path('api/recommendations/', include('recommendations.urls')),
     path('api/users/', include('users.urls')),
 ]
 
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
+
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    urlpatterns += static(settings.MEDIA_URL, view=serve_media, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -0,0 +1,26 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def warmup():
+    """Run ``settings.WARMUP_HOOKS`` so the first requests don't pay cold-start cost.
+
+    A failing hook is logged and skipped; the worker can still serve traffic
+    and the cache or index will be built lazily on first use instead.
+    """
+    for path in settings.WARMUP_HOOKS:
+        started = time.perf_counter()
+        try:
+            import_string(path)()
+        except Exception:
+            logger.exception("Warmup hook %s failed", path)
+        else:
+            logger.info("Warmup hook %s took %.1f ms", path, (time.perf_counter() - started) * 1000)
+    # Don't hand connections opened here to a forked child process.
+    connections.close_all()
@@ -0,0 +1,23 @@
+from django.utils.module_loading import import_string
+
+
+class LazyFilterBackend:
+    """Filter backend that imports the real backend class on first use.
+
+    Keeps optional, import-heavy filtering packages out of worker startup.
+    """
+    backend_path = None
+    _backend_class = None
+
+    def __init__(self):
+        cls = type(self)
+        if cls._backend_class is None:
+            cls._backend_class = import_string(cls.backend_path)
+        self._backend = cls._backend_class()
+
+    def __getattr__(self, name):
+        return getattr(self._backend, name)
+
+
+class DjangoFilterBackend(LazyFilterBackend):
+    backend_path = 'django_filters.rest_framework.DjangoFilterBackend'
@@ -1,5 +1,7 @@
 from django.db import models
 
+from bookrec.images import refresh_variants
+
 class Genre(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
@@ -46,6 +48,7 @@ class Book(models.Model):
     genres = models.ManyToManyField(Genre, related_name='books')
     description = models.TextField()
     cover_image = models.ImageField(upload_to='book_covers/', blank=True, null=True)
+    cover_variants = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized copies of cover_image")
     published_date = models.DateField()
     
     # Recommendation factors
@@ -65,5 +68,41 @@ class Book(models.Model):
     def __str__(self):
         return self.title
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        refresh_variants(self, 'cover_image', 'cover_variants')
+    
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+
+class BookStats(models.Model):
+    """Engagement counters for a book, maintained incrementally from interactions."""
+    book = models.OneToOneField(Book, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    
+    view_count = models.PositiveIntegerField(default=0)
+    save_count = models.PositiveIntegerField(default=0)
+    read_count = models.PositiveIntegerField(default=0)
+    like_count = models.PositiveIntegerField(default=0)
+    dislike_count = models.PositiveIntegerField(default=0)
+    rate_count = models.PositiveIntegerField(default=0)
+    
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    average_rating = models.FloatField(null=True, blank=True)
+    
+    # Sum of interaction weights, each halved every BOOK_TRENDING_HALF_LIFE hours
+    trending_score = models.FloatField(default=0, db_index=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Stats for {self.book.title}"
+
+
+class BookStatsCheckpoint(models.Model):
+    """How far ``BookStats`` has consumed the interaction log."""
+    last_interaction_id = models.BigIntegerField(default=0)
+    decayed_at = models.DateTimeField(help_text="Time trending scores were last decayed to")
+    
+    def __str__(self):
+        return f"Book stats up to interaction {self.last_interaction_id}"
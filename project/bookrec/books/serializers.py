@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from .models import Book, Author, Genre
+
+from bookrec.images import variant_urls
+from .models import Book, Author, Genre, BookStats
 
 class GenreSerializer(serializers.ModelSerializer):
     class Meta:
@@ -14,22 +16,40 @@ class AuthorSerializer(serializers.ModelSerializer):
 class BookSerializer(serializers.ModelSerializer):
     author_name = serializers.CharField(source='author.name', read_only=True)
     genres_list = serializers.SerializerMethodField()
+    cover_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = Book
         fields = [
             'id', 'title', 'author', 'author_name', 'genres_list', 
-            'description', 'cover_image', 'published_date', 
+            'description', 'cover_image', 'cover_variants', 'published_date', 
             'suitable_moods', 'themes', 'complexity', 'personality_match',
             'page_count', 'isbn', 'language'
         ]
     
     def get_genres_list(self, obj):
         return [genre.name for genre in obj.genres.all()]
+    
+    def get_cover_variants(self, obj):
+        return variant_urls(obj.cover_variants, obj.cover_image.storage, self.context.get('request'))
 
 class BookDetailSerializer(BookSerializer):
     author = AuthorSerializer(read_only=True)
     genres = GenreSerializer(many=True, read_only=True)
     
     class Meta(BookSerializer.Meta):
-        fields = BookSerializer.Meta.fields + ['created_at', 'updated_at']
\ No newline at end of file
+        fields = BookSerializer.Meta.fields + ['created_at', 'updated_at']
+
+class BookStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BookStats
+        fields = [
+            'view_count', 'save_count', 'read_count', 'like_count',
+            'dislike_count', 'rate_count', 'average_rating', 'trending_score'
+        ]
+
+class TrendingBookSerializer(BookSerializer):
+    stats = BookStatsSerializer(read_only=True)
+    
+    class Meta(BookSerializer.Meta):
+        fields = BookSerializer.Meta.fields + ['stats']
\ No newline at end of file
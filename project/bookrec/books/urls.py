@@ -7,4 +7,5 @@ urlpatterns = [
     path('genres/', views.GenreListView.as_view(), name='genre-list'),
     path('authors/', views.AuthorListView.as_view(), name='author-list'),
     path('search/', views.BookSearchView.as_view(), name='book-search'),
+    path('trending/', views.TrendingBookListView.as_view(), name='book-trending'),
 ]
\ No newline at end of file
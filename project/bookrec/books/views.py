@@ -1,7 +1,10 @@
 from rest_framework import generics, filters
 from .models import Book, Author, Genre
-from .serializers import BookSerializer, BookDetailSerializer, AuthorSerializer, GenreSerializer
-from django_filters.rest_framework import DjangoFilterBackend
+from .serializers import (
+    BookSerializer, BookDetailSerializer, AuthorSerializer, GenreSerializer,
+    TrendingBookSerializer
+)
+from .filters import DjangoFilterBackend
 
 class BookListView(generics.ListAPIView):
     queryset = Book.objects.all()
@@ -42,4 +45,19 @@ class BookSearchView(generics.ListAPIView):
         if complexity:
             queryset = queryset.filter(complexity=complexity)
             
+        return queryset
+
+class TrendingBookListView(generics.ListAPIView):
+    serializer_class = TrendingBookSerializer
+    
+    def get_queryset(self):
+        queryset = (
+            Book.objects.filter(stats__trending_score__gt=0)
+            .select_related('author', 'stats')
+            .prefetch_related('genres')
+            .order_by('-stats__trending_score')
+        )
+        mood = self.request.query_params.get('mood')
+        if mood:
+            queryset = queryset.filter(suitable_moods=mood)
         return queryset
\ No newline at end of file
@@ -2,16 +2,13 @@ import os
 import django
 import datetime
 
-# Set up Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bookrec.settings')
-django.setup()
-
-from django.contrib.auth.models import User
-from books.models import Genre, Author, Book
-from recommendations.models import UserPreference
-from users.models import UserProfile
-
 def create_initial_data():
+    # Imported here so importing this module doesn't set up Django
+    from django.contrib.auth.models import User
+    from books.models import Genre, Author, Book
+    from recommendations.models import UserPreference
+    from users.models import UserProfile
+    
     print("Creating initial data...")
     
     # Create genres
@@ -266,4 +263,7 @@ def create_initial_data():
     print("Initial data creation completed!")
 
 if __name__ == "__main__":
+    # Set up Django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bookrec.settings')
+    django.setup()
     create_initial_data()
\ No newline at end of file
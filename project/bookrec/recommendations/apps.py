@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class RecommendationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'recommendations'
\ No newline at end of file
+    name = 'recommendations'
+
+    def ready(self):
+        from . import signals  # noqa: F401
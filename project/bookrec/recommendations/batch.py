@@ -0,0 +1,163 @@
+"""
+Recommendations for many (user, mood) pairs at once.
+
+Instead of running ``generate_recommendations`` once per pair, each chunk of
+pairs loads its preferences, favorite genres, liked books and exclusions in a
+handful of bulk queries. Candidates come from the in-memory catalogue index.
+Pairs that share a mood, personality, complexity and favorite genres share
+one candidate mask and one ``score_batch`` pass. Only the per-user liked
+bonus, exclusions and ranking are done per pair. Results are yielded per
+pair so callers can stream them as NDJSON.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+
+from .catalogue import get_catalogue_index
+from .diversity import mmr_rerank
+from .engine import RECOMMENDATION_LIMIT, catalogue_features, store_recommendations
+from .exclusions import exclusion_mask, load_excluded_book_ids_many
+from .models import Recommendation, UserBookInteraction, UserPreference
+from .scoring import UserContext, clamp_intensity, explain_batch, get_profile, rank, score_batch
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    user_id: int
+    mood: str
+    intensity: int = 5
+
+
+def parse_items(data):
+    """Validate a list of ``{"user_id", "mood", "intensity"?}`` objects.
+
+    Returns ``(items, errors)`` where ``errors`` maps list positions to messages.
+    """
+    items, errors = [], {}
+    for position, entry in enumerate(data):
+        if not isinstance(entry, dict):
+            errors[position] = "Expected an object"
+            continue
+        user_id, mood = entry.get('user_id'), entry.get('mood')
+        if not isinstance(user_id, int) or isinstance(user_id, bool):
+            errors[position] = "user_id must be an integer"
+        elif not isinstance(mood, str) or not mood:
+            errors[position] = "mood is required"
+        else:
+            items.append(BatchItem(user_id, mood, clamp_intensity(entry.get('intensity', 5))))
+    return items, errors
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def load_users(user_ids):
+    """Preferences (with favorite genre ids), liked and excluded books for ``user_ids``."""
+    existing = set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+    preferences = {
+        preference.user_id: preference
+        for preference in UserPreference.objects.filter(user_id__in=existing).prefetch_related('favorite_genres')
+    }
+    favorite_genres = {
+        user_id: tuple(sorted(genre.id for genre in preference.favorite_genres.all()))
+        for user_id, preference in preferences.items()
+    }
+    liked = defaultdict(set)
+    rows = (
+        UserBookInteraction.objects
+        .filter(user_id__in=existing, interaction_type='like')
+        .values_list('user_id', 'book_id')
+        .distinct()
+    )
+    for user_id, book_id in rows:
+        liked[user_id].add(book_id)
+    # Not the cached sets: they may be stale outside the process that saved the interaction.
+    excluded = load_excluded_book_ids_many(existing)
+    return existing, preferences, favorite_genres, liked, excluded
+
+
+def suggest_batch(items, profile=None, diversity=None, store=True, chunk_size=None):
+    """Yield one result dict per :class:`BatchItem`, in input order.
+
+    Each result has ``user_id``, ``mood`` and either ``recommendations``
+    (``book_id``, ``score``, ``reason``) or an ``error``. With ``store`` the
+    results also replace the users' stored ``Recommendation`` rows, with one
+    upsert per chunk.
+    """
+    profile = profile or get_profile()
+    if diversity is None:
+        diversity = settings.RECOMMENDATION_DEFAULT_DIVERSITY
+    chunk_size = chunk_size or settings.RECOMMENDATION_BATCH_CHUNK_SIZE
+
+    index = get_catalogue_index()
+    catalogue = catalogue_features(index, profile)
+
+    for chunk in chunked(items, chunk_size):
+        existing, preferences, favorite_genres, liked, excluded = load_users({item.user_id for item in chunk})
+
+        # Candidates and base scores depend only on the group key, not on the user.
+        groups = {}
+        results = []
+        for item in chunk:
+            if item.user_id not in existing:
+                results.append({'user_id': item.user_id, 'mood': item.mood, 'error': "Unknown user"})
+                continue
+            preference = preferences.get(item.user_id)
+            context = UserContext.build(item.mood, item.intensity, preference, liked[item.user_id])
+            genres = favorite_genres.get(item.user_id, ())
+            key = (item.mood, context.intensity, context.personality, context.complexity, genres)
+            if key not in groups:
+                rows = np.flatnonzero(index.candidate_mask(context, genres))
+                features = catalogue.subset(rows)
+                base = UserContext.build(item.mood, item.intensity, preference)
+                groups[key] = (rows, features, score_batch(base, features, profile))
+            results.append(rank_for_user(item, context, excluded[item.user_id], groups[key], index, profile, diversity))
+
+        if store:
+            store_results(results)
+        yield from results
+
+
+def rank_for_user(item, context, excluded_ids, group, index, profile, diversity):
+    rows, features, scores = group
+    scores = scores.copy()
+    if len(context.liked_ids) and profile.liked:
+        scores += profile.liked * np.isin(features.book_ids, context.liked_ids)
+        np.minimum(scores, profile.max_score, out=scores)
+    allowed = np.flatnonzero(exclusion_mask(features.book_ids, excluded_ids))
+
+    limit = settings.RECOMMENDATION_DIVERSITY_POOL if diversity > 0 else RECOMMENDATION_LIMIT
+    top = allowed[rank(scores[allowed], limit)]
+    if diversity > 0:
+        top = top[mmr_rerank(scores[top], index.vectors[rows[top]], RECOMMENDATION_LIMIT, diversity)]
+    reasons = explain_batch(context, features, top)
+    return {
+        'user_id': item.user_id,
+        'mood': item.mood,
+        'recommendations': [
+            {'book_id': book_id, 'score': score, 'reason': reason}
+            for book_id, score, reason in zip(features.book_ids[top].tolist(), scores[top].tolist(), reasons)
+        ],
+    }
+
+
+def store_results(results):
+    store_recommendations([
+        Recommendation(
+            user_id=result['user_id'],
+            book_id=entry['book_id'],
+            current_mood=result['mood'],
+            score=entry['score'],
+            reason=entry['reason'],
+            is_read=False,
+        )
+        for result in results if 'recommendations' in result
+        for entry in result['recommendations']
+    ])
@@ -0,0 +1,145 @@
+"""
+Per-process, precomputed feature index over the whole book catalogue.
+
+Holds the scoring feature codes for every book plus a unit-normalised
+similarity vector built from genres, author and themes, so re-ranking and
+batch scoring never go back to the database per book. The index is rebuilt
+lazily on first use and whenever the ``CatalogueVersion`` row, bumped by the
+``Book`` signal receivers, has changed. The version is kept in the database
+rather than the cache so every worker process sees catalogue changes.
+"""
+import threading
+import zlib
+
+import numpy as np
+from django.conf import settings
+from django.db.models import F
+
+from bookrec.routers import use_primary
+from books.models import Book
+from .models import CatalogueVersion
+from .scoring import UNKNOWN, CandidateFeatures
+
+VERSION_PK = 1
+
+# Authors and theme words are hashed into fixed-width blocks so the vector
+# size doesn't grow with the catalogue.
+AUTHOR_BUCKETS = 64
+THEME_BUCKETS = 64
+
+_lock = threading.Lock()
+_index = None
+
+
+def stable_bucket(value, buckets):
+    return zlib.crc32(value.encode('utf-8')) % buckets
+
+
+def normalise_rows(block):
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    np.divide(block, norms, out=block, where=norms > 0)
+    return block
+
+
+class CatalogueIndex:
+    def __init__(self, version, features, vectors, genre_ids, genre_matrix):
+        self.version = version
+        self.features = features
+        self.vectors = vectors
+        # genre_matrix[row, column] is True when the book has genre_ids[column]
+        self.genre_ids = genre_ids
+        self.genre_matrix = genre_matrix
+
+    @classmethod
+    def build(cls, version=None):
+        with use_primary():
+            # A lagging replica would pin an old catalogue to the new version.
+            return cls._build(version)
+
+    @classmethod
+    def _build(cls, version):
+        rows = list(
+            Book.objects.order_by('id')
+            .values_list('id', 'suitable_moods', 'personality_match', 'complexity', 'author_id', 'themes')
+        )
+        features = CandidateFeatures.from_rows(row[:4] for row in rows)
+        n = len(rows)
+
+        genre_links = list(Book.genres.through.objects.values_list('book_id', 'genre_id'))
+        genre_columns = {genre_id: column for column, genre_id in enumerate(sorted({g for _, g in genre_links}))}
+        genre_matrix = np.zeros((n, len(genre_columns)), dtype=bool)
+        if genre_links:
+            link_rows = np.searchsorted(features.book_ids, [book_id for book_id, _ in genre_links])
+            genre_matrix[link_rows, [genre_columns[genre_id] for _, genre_id in genre_links]] = True
+        genres = genre_matrix.astype(np.float32)
+
+        authors = np.zeros((n, AUTHOR_BUCKETS), dtype=np.float32)
+        themes = np.zeros((n, THEME_BUCKETS), dtype=np.float32)
+        for row, (_, _, _, _, author_id, theme_text) in enumerate(rows):
+            authors[row, stable_bucket(str(author_id), AUTHOR_BUCKETS)] = 1
+            for theme in theme_text.split(','):
+                theme = theme.strip().lower()
+                if theme:
+                    themes[row, stable_bucket(theme, THEME_BUCKETS)] = 1
+
+        # Scale each unit block by sqrt(weight) so the dot product of two
+        # vectors is the weighted sum of per-block cosine similarities.
+        weights = settings.RECOMMENDATION_DIVERSITY_FEATURE_WEIGHTS
+        vectors = np.hstack([
+            normalise_rows(genres) * np.sqrt(weights['genre']),
+            normalise_rows(authors) * np.sqrt(weights['author']),
+            normalise_rows(themes) * np.sqrt(weights['theme']),
+        ]).astype(np.float32)
+        genre_ids = np.asarray(sorted(genre_columns), dtype=np.int64)
+        return cls(version, features, vectors, genre_ids, genre_matrix)
+
+    def candidate_mask(self, context, favorite_genre_ids=()):
+        """Rows matching the mood, personality or complexity, limited to favorite genres if any."""
+        features = self.features
+        mask = features.mood_codes == context.mood_code
+        if context.personality_code != UNKNOWN:
+            mask |= features.personality_codes == context.personality_code
+        if context.complexity_code != UNKNOWN:
+            mask |= features.complexity_codes == context.complexity_code
+        if len(favorite_genre_ids):
+            columns = np.isin(self.genre_ids, favorite_genre_ids)
+            mask &= self.genre_matrix[:, columns].any(axis=1)
+        return mask
+
+    def rows_for(self, book_ids):
+        """Index rows for ``book_ids``; -1 where a book isn't in the index."""
+        book_ids = np.asarray(book_ids, dtype=np.int64)
+        rows = np.searchsorted(self.features.book_ids, book_ids)
+        rows = np.minimum(rows, max(len(self.features) - 1, 0))
+        found = len(self.features) > 0 and self.features.book_ids[rows] == book_ids
+        return np.where(found, rows, -1)
+
+    def vectors_for(self, book_ids):
+        rows = self.rows_for(book_ids)
+        vectors = self.vectors[np.maximum(rows, 0)] if len(self.vectors) else np.zeros(
+            (len(rows), self.vectors.shape[1]), dtype=np.float32
+        )
+        vectors[rows < 0] = 0
+        return vectors
+
+
+def current_version():
+    return CatalogueVersion.objects.filter(pk=VERSION_PK).values_list('version', flat=True).first() or 0
+
+
+def get_catalogue_index():
+    """Return the current index, rebuilding it if the catalogue changed."""
+    global _index
+    version = current_version()
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    with _lock:
+        if _index is None or _index.version != version:
+            _index = CatalogueIndex.build(version)
+        return _index
+
+
+def invalidate_catalogue_index():
+    CatalogueVersion.objects.get_or_create(pk=VERSION_PK)
+    CatalogueVersion.objects.filter(pk=VERSION_PK).update(version=F('version') + 1)
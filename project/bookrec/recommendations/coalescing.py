@@ -0,0 +1,45 @@
+"""
+In-process coalescing of identical concurrent computations.
+
+When several threads ask for the same key at once, only the first (the
+leader) runs the computation. The others wait for the leader and get its
+result or exception. Nothing is cached, so a call that starts after the
+leader has finished computes again. Coalescing is per worker process.
+"""
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.computed = 0
+        self.coalesced = 0
+
+    def do(self, key, compute):
+        """Return ``compute()``, sharing one call among concurrent callers with the same ``key``."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.computed += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(compute())
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result()
+
+    def reset_counts(self):
+        with self._lock:
+            self.computed = 0
+            self.coalesced = 0
@@ -0,0 +1,38 @@
+"""
+Maximal marginal relevance (MMR) re-ranking.
+
+Given relevance scores and unit feature vectors for the top-N candidates,
+greedily picks the candidate that maximises
+
+    (1 - diversity) * relevance - diversity * max similarity to already picked
+
+so near-duplicates (same genre, author, themes) stop crowding the results.
+Each pick costs one N x D matrix-vector product.
+"""
+import numpy as np
+
+from .scoring import rank
+
+
+def mmr_rerank(scores, vectors, limit, diversity):
+    """Return indices into ``scores`` of up to ``limit`` candidates in MMR order.
+
+    ``diversity`` is in 0..1; 0 is plain ranking by score.
+    """
+    n = len(scores)
+    if diversity <= 0 or n <= 1:
+        return rank(scores, limit)
+
+    spread = scores.max() - scores.min()
+    relevance = (scores - scores.min()) / spread if spread > 0 else np.ones(n)
+    max_similarity = np.zeros(n)
+    available = np.ones(n, dtype=bool)
+    picked = []
+    for _ in range(min(limit, n)):
+        marginal = (1 - diversity) * relevance - diversity * max_similarity
+        marginal[~available] = -np.inf
+        best = int(np.argmax(marginal))
+        picked.append(best)
+        available[best] = False
+        np.maximum(max_similarity, vectors @ vectors[best], out=max_similarity)
+    return np.asarray(picked, dtype=np.intp)
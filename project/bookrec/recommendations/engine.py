@@ -0,0 +1,165 @@
+from dataclasses import replace
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+
+from bookrec.routers import use_primary
+from books.models import BookStats
+from .catalogue import get_catalogue_index
+from .coalescing import SingleFlight
+from .diversity import mmr_rerank
+from .exclusions import exclusion_mask, get_excluded_book_ids
+from .models import UserPreference, Recommendation, UserBookInteraction
+from .scoring import (
+    UserContext, clamp_intensity, explain_batch, get_profile, rank, score_batch
+)
+
+RECOMMENDATION_LIMIT = 10
+
+
+def get_preferences(user):
+    try:
+        return user.preference
+    except UserPreference.DoesNotExist:
+        # Default to medium complexity and creative personality if no preferences set
+        return None
+
+
+def popularity_prior(book_ids=None):
+    """Map book id to its trending score scaled into 0..1 against the hottest book.
+
+    ``book_ids`` of None covers the whole catalogue.
+    """
+    top = BookStats.objects.aggregate(top=Max('trending_score'))['top']
+    if not top or top <= 0:
+        return {}
+    scores = BookStats.objects.filter(trending_score__gt=0)
+    if book_ids is not None:
+        scores = scores.filter(book_id__in=book_ids)
+    scores = scores.values_list('book_id', 'trending_score')
+    return {book_id: score / top for book_id, score in scores}
+
+
+def catalogue_features(index, profile):
+    """``index.features`` with the popularity prior filled in when ``profile`` weights it."""
+    features = index.features
+    if not profile.popularity:
+        return features
+    prior = popularity_prior()
+    return replace(features, popularity=np.fromiter(
+        (prior.get(book_id, 0.0) for book_id in features.book_ids.tolist()),
+        dtype=np.float64, count=len(features),
+    ))
+
+
+def liked_book_ids(user):
+    return UserBookInteraction.objects.filter(
+        user=user, interaction_type='like'
+    ).order_by().values_list('book_id', flat=True).distinct()
+
+
+def score_recommendations(user, mood, intensity, preferences, profile, diversity, excluded_ids):
+    """Rank candidates for ``user``; returns ``[(book_id, score, reason), ...]``.
+
+    Candidates come from the in-memory catalogue index, so only the user's
+    likes, favorite genres and (uncached) exclusions are read from the database.
+    """
+    index = get_catalogue_index()
+    context = UserContext.build(mood, intensity, preferences, liked_book_ids(user))
+    genre_ids = list(preferences.favorite_genres.values_list('id', flat=True)) if preferences else []
+    rows = np.flatnonzero(index.candidate_mask(context, genre_ids))
+
+    # Never re-recommend books the user has read or disliked
+    if excluded_ids is None:
+        excluded_ids = get_excluded_book_ids(user.pk)
+    rows = rows[exclusion_mask(index.features.book_ids[rows], excluded_ids)]
+    features = catalogue_features(index, profile).subset(rows)
+
+    scores = score_batch(context, features, profile)
+    top = rank(scores, settings.RECOMMENDATION_DIVERSITY_POOL if diversity > 0 else RECOMMENDATION_LIMIT)
+    if diversity > 0:
+        top = top[mmr_rerank(scores[top], index.vectors[rows[top]], RECOMMENDATION_LIMIT, diversity)]
+    reasons = explain_batch(context, features, top)
+    return list(zip(features.book_ids[top].tolist(), scores[top].tolist(), reasons))
+
+
+def store_recommendations(recommendations):
+    """Insert or update ``Recommendation`` rows with a single upsert statement.
+
+    Rows are written in (user, mood, book) order so concurrent upserts lock
+    rows in the same order and can't deadlock each other. A later duplicate
+    of the same key replaces an earlier one, since one upsert statement may
+    not touch a row twice.
+    """
+    unique = {
+        (rec.user_id, rec.current_mood or '', rec.book_id): rec for rec in recommendations
+    }
+    if unique:
+        Recommendation.objects.bulk_create(
+            [unique[key] for key in sorted(unique)],
+            update_conflicts=True,
+            unique_fields=['user', 'book', 'current_mood'],
+            update_fields=['score', 'reason', 'is_read'],
+        )
+
+
+def generate_recommendations(user, mood, intensity=5, preferences=None, profile=None, diversity=None,
+                             excluded_ids=None):
+    """Score books for ``user`` in ``mood`` and store them as ``Recommendation`` rows.
+
+    With ``diversity`` above 0 the best candidates are re-ranked with MMR.
+    ``excluded_ids`` overrides the cached read/disliked set (see ``exclusions``).
+    Returns the stored recommendations in ranked order.
+    """
+    if preferences is None:
+        preferences = get_preferences(user)
+    profile = profile or get_profile()
+    if diversity is None:
+        diversity = settings.RECOMMENDATION_DEFAULT_DIVERSITY
+
+    # Read the user's data inside one transaction so every query sees the same
+    # snapshot (on SQLite, and on PostgreSQL at REPEATABLE READ), and write
+    # only after it has ended. A transaction that reads and then writes would
+    # need to upgrade its lock, which on SQLite fails at once with "database
+    # is locked" instead of waiting out the busy timeout.
+    with transaction.atomic():
+        ranked = score_recommendations(user, mood, intensity, preferences, profile, diversity, excluded_ids)
+
+    store_recommendations([
+        Recommendation(user=user, book_id=book_id, current_mood=mood, score=score, reason=reason, is_read=False)
+        for book_id, score, reason in ranked
+    ])
+
+    # Read back for ids and created_at; the rows were just written to the primary.
+    with use_primary():
+        stored = {
+            rec.book_id: rec
+            for rec in Recommendation.objects.filter(
+                user=user, current_mood=mood, book_id__in=[book_id for book_id, _, _ in ranked]
+            ).select_related('book__author').prefetch_related('book__genres')
+        }
+    return [stored[book_id] for book_id, _, _ in ranked if book_id in stored]
+
+
+_in_flight = SingleFlight()
+
+
+def coalesced_recommendations(user, mood, intensity=5, profile=None, diversity=None):
+    """``generate_recommendations``, shared by concurrent identical calls in this process."""
+    profile = profile or get_profile()
+    if diversity is None:
+        diversity = settings.RECOMMENDATION_DEFAULT_DIVERSITY
+    return _in_flight.do(
+        (user.pk, mood, clamp_intensity(intensity), profile, diversity),
+        lambda: generate_recommendations(user, mood, intensity, profile=profile, diversity=diversity),
+    )
+
+
+def coalescing_counts():
+    return {'computed': _in_flight.computed, 'coalesced': _in_flight.coalesced}
+
+
+def reset_coalescing_counts():
+    _in_flight.reset_counts()
@@ -0,0 +1,189 @@
+"""
+Offline evaluation of recommendation scoring against exported events.
+
+Every exported mood entry is treated as a ``/suggest/`` call made at that
+moment. The user's earlier interactions feed the scoring context (liked
+books, read/disliked exclusions). Books they engaged with positively within
+the following ``horizon`` count as relevant. The scored top-k is then
+compared with that relevant set, and the time spent in the scoring code is
+reported as throughput.
+
+The popularity prior is rebuilt from the exported interactions made before
+each event, the way ``update_book_stats`` would have had it then, rather than
+taken from today's ``BookStats``, which already counts the interactions being
+predicted.
+"""
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from .catalogue import get_catalogue_index
+from .diversity import mmr_rerank
+from .exclusions import EXCLUDING_INTERACTIONS
+from .export import FORMATS, read_rows
+from .models import UserPreference
+from .scoring import UserContext, get_profile, rank, score_batch
+from .stats import decay_factor
+
+
+def is_positive(interaction_type, rating):
+    if interaction_type == 'rate':
+        return rating is not None and rating >= 4
+    return interaction_type in ('like', 'save', 'read')
+
+
+def as_datetime(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def find_export(export_dir, table):
+    for suffix in FORMATS.values():
+        path = Path(export_dir) / f'{table}{suffix}'
+        if path.exists():
+            return path
+    raise FileNotFoundError(f"No {table} export found in {export_dir}")
+
+
+@dataclass
+class EvaluationResult:
+    k: int
+    events: int = 0
+    precision_sum: float = 0.0
+    recall_sum: float = 0.0
+    candidates_scored: int = 0
+    scoring_seconds: float = 0.0
+
+    @property
+    def precision(self):
+        return self.precision_sum / self.events if self.events else 0.0
+
+    @property
+    def recall(self):
+        return self.recall_sum / self.events if self.events else 0.0
+
+    @property
+    def events_per_second(self):
+        return self.events / self.scoring_seconds if self.scoring_seconds else 0.0
+
+    @property
+    def candidates_per_second(self):
+        return self.candidates_scored / self.scoring_seconds if self.scoring_seconds else 0.0
+
+
+def load_history(export_dir):
+    """Per-user interaction history as parallel, time-sorted lists."""
+    history = defaultdict(list)
+    for row in read_rows(find_export(export_dir, 'interactions')):
+        history[row['user_id']].append(
+            (as_datetime(row['timestamp']), row['book_id'], row['interaction_type'], row['rating'])
+        )
+    for events in history.values():
+        events.sort(key=lambda event: event[0])
+    return {
+        user_id: ([event[0] for event in events], events)
+        for user_id, events in history.items()
+    }
+
+
+class PopularityReplay:
+    """Popularity prior for ``book_ids`` as of a moment, from time-sorted interactions.
+
+    Calls to :meth:`as_of` must not go back in time.
+    """
+
+    def __init__(self, interactions, book_ids):
+        self.interactions = interactions
+        self.positions = {book_id: position for position, book_id in enumerate(book_ids.tolist())}
+        self.scores = np.zeros(len(book_ids))
+        self.at = None
+        self.consumed = 0
+
+    def as_of(self, at):
+        if self.at is not None:
+            self.scores *= decay_factor((at - self.at).total_seconds())
+        self.at = at
+        weights = settings.BOOK_TRENDING_WEIGHTS
+        while self.consumed < len(self.interactions) and self.interactions[self.consumed][0] < at:
+            timestamp, book_id, interaction_type, _ = self.interactions[self.consumed]
+            position = self.positions.get(book_id)
+            if position is not None:
+                self.scores[position] += (
+                    weights.get(interaction_type, 0) * decay_factor((at - timestamp).total_seconds())
+                )
+            self.consumed += 1
+        top = self.scores.max(initial=0)
+        if top <= 0:
+            return np.zeros(len(self.scores))
+        return np.clip(self.scores / top, 0, None)
+
+
+def evaluate(export_dir, k=10, horizon=timedelta(days=7), profile=None, diversity=0):
+    profile = profile or get_profile()
+    index = get_catalogue_index()
+    history = load_history(export_dir)
+    popularity = None
+    if profile.popularity:
+        interactions = sorted(
+            (event for _, events in history.values() for event in events), key=lambda event: event[0]
+        )
+        popularity = PopularityReplay(interactions, index.features.book_ids)
+    preferences = {
+        preference.user_id: preference
+        for preference in UserPreference.objects.filter(user_id__in=list(history)).prefetch_related('favorite_genres')
+    }
+    result = EvaluationResult(k=k)
+
+    moods = sorted(read_rows(find_export(export_dir, 'moods')), key=lambda mood: as_datetime(mood['timestamp']))
+    for mood in moods:
+        if mood['user_id'] not in history:
+            continue
+        timestamps, events = history[mood['user_id']]
+        at = as_datetime(mood['timestamp'])
+        split = bisect_left(timestamps, at)
+        past = events[:split]
+        future = events[split:bisect_right(timestamps, at + horizon)]
+
+        excluded = {book_id for _, book_id, kind, _ in past if kind in EXCLUDING_INTERACTIONS}
+        relevant = {
+            book_id for _, book_id, kind, rating in future if is_positive(kind, rating)
+        } - excluded
+        if not relevant:
+            continue
+
+        preference = preferences.get(mood['user_id'])
+        context = UserContext.build(
+            mood['mood'], mood['intensity'], preference,
+            {book_id for _, book_id, kind, _ in past if kind == 'like'},
+        )
+        favorite_genres = [genre.id for genre in preference.favorite_genres.all()] if preference else []
+        catalogue = index.features
+        if popularity is not None:
+            catalogue = replace(catalogue, popularity=popularity.as_of(at))
+
+        started = time.perf_counter()
+        mask = index.candidate_mask(context, favorite_genres)
+        if excluded:
+            mask &= ~np.isin(index.features.book_ids, list(excluded))
+        features = catalogue.subset(mask)
+        scores = score_batch(context, features, profile)
+        if diversity > 0:
+            pool = rank(scores, settings.RECOMMENDATION_DIVERSITY_POOL)
+            top = pool[mmr_rerank(scores[pool], index.vectors_for(features.book_ids[pool]), k, diversity)]
+        else:
+            top = rank(scores, k)
+        recommended = set(features.book_ids[top].tolist())
+        result.scoring_seconds += time.perf_counter() - started
+        result.candidates_scored += len(features)
+
+        hits = len(recommended & relevant)
+        result.events += 1
+        result.precision_sum += hits / k
+        result.recall_sum += hits / len(relevant)
+
+    return result
@@ -0,0 +1,78 @@
+"""
+Per-user sets of books that must never be recommended again.
+
+A user's "seen/blocked" set is every book they have read or disliked. It is
+kept in the cache as a sorted ``array('q')`` of book ids (8 bytes per id),
+built from ``UserBookInteraction`` on first use and dropped whenever a
+read/dislike interaction is saved or deleted. Candidate generation applies it
+as one vectorised mask over the candidate ids rather than as a SQL ``NOT IN``,
+which would grow with the user's history.
+
+Unless a shared cache is configured, the cached sets are per process and are
+only dropped by receivers running in the same process, so the cache timeout
+is kept to seconds and bounds how stale other workers can be. Work done
+outside the request path (the regeneration worker, batch suggestions)
+therefore loads the sets straight from the database with the ``load_*``
+functions.
+"""
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import UserBookInteraction
+
+EXCLUDING_INTERACTIONS = ('read', 'dislike')
+
+
+def cache_key(user_id):
+    return f'rec-excluded:{user_id}'
+
+
+def load_excluded_book_ids(user_id):
+    book_ids = (
+        UserBookInteraction.objects
+        .filter(user_id=user_id, interaction_type__in=EXCLUDING_INTERACTIONS)
+        .values_list('book_id', flat=True)
+        .distinct()
+    )
+    return array('q', sorted(book_ids))
+
+
+def load_excluded_book_ids_many(user_ids):
+    """Like :func:`load_excluded_book_ids` for many users, in one query."""
+    loaded = {user_id: [] for user_id in user_ids}
+    rows = (
+        UserBookInteraction.objects
+        .filter(user_id__in=loaded, interaction_type__in=EXCLUDING_INTERACTIONS)
+        .values_list('user_id', 'book_id')
+        .distinct()
+    )
+    for user_id, book_id in rows:
+        loaded[user_id].append(book_id)
+    return {user_id: array('q', sorted(book_ids)) for user_id, book_ids in loaded.items()}
+
+
+def get_excluded_book_ids(user_id):
+    """Return the sorted ids of books ``user_id`` has read or disliked."""
+    key = cache_key(user_id)
+    book_ids = cache.get(key)
+    if book_ids is None:
+        book_ids = load_excluded_book_ids(user_id)
+        cache.set(key, book_ids, settings.RECOMMENDATION_EXCLUSION_CACHE_TIMEOUT)
+    return book_ids
+
+
+def invalidate_excluded_books(user_id):
+    cache.delete(cache_key(user_id))
+
+
+def exclusion_mask(candidate_ids, excluded_ids):
+    """Boolean mask that is False for each candidate id found in ``excluded_ids``."""
+    import numpy as np
+
+    candidates = np.asarray(candidate_ids, dtype=np.int64)
+    if not len(excluded_ids):
+        return np.ones(len(candidates), dtype=bool)
+    excluded = np.frombuffer(excluded_ids, dtype=np.int64)
+    return np.isin(candidates, excluded, invert=True)
@@ -0,0 +1,120 @@
+"""
+Streaming export of recommendation events for offline evaluation.
+
+Rows are read with ``QuerySet.iterator(chunk_size=...)`` (a server-side cursor
+on PostgreSQL) and written out as they arrive, so memory stays constant
+whatever the table size. Output is gzip-compressed JSONL, or Parquet when
+``pyarrow`` is installed.
+"""
+import gzip
+import json
+from datetime import date, datetime
+from itertools import islice
+
+from .models import Recommendation, UserBookInteraction, UserMood
+
+EXPORTS = {
+    'recommendations': (
+        Recommendation,
+        ['id', 'user_id', 'book_id', 'score', 'current_mood', 'is_read', 'created_at'],
+    ),
+    'interactions': (
+        UserBookInteraction,
+        ['id', 'user_id', 'book_id', 'interaction_type', 'rating', 'timestamp'],
+    ),
+    'moods': (
+        UserMood,
+        ['id', 'user_id', 'mood', 'intensity', 'timestamp'],
+    ),
+}
+
+# Parquet column types, spelled as pyarrow type factories.
+ARROW_TYPES = {
+    'id': 'int64',
+    'user_id': 'int64',
+    'book_id': 'int64',
+    'score': 'float64',
+    'current_mood': 'string',
+    'is_read': 'bool_',
+    'created_at': 'timestamp',
+    'interaction_type': 'string',
+    'rating': 'int64',
+    'timestamp': 'timestamp',
+    'mood': 'string',
+    'intensity': 'int64',
+}
+
+FORMATS = {
+    'jsonl': '.jsonl.gz',
+    'parquet': '.parquet',
+}
+
+
+def iter_rows(table, chunk_size):
+    model, fields = EXPORTS[table]
+    return model.objects.order_by('id').values(*fields).iterator(chunk_size=chunk_size)
+
+
+def json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+def write_jsonl(path, rows):
+    count = 0
+    with gzip.open(path, 'wt', encoding='utf-8') as out:
+        for row in rows:
+            out.write(json.dumps(row, default=json_default))
+            out.write('\n')
+            count += 1
+    return count
+
+
+def arrow_schema(fields):
+    import pyarrow as pa
+
+    def arrow_type(name):
+        if ARROW_TYPES[name] == 'timestamp':
+            return pa.timestamp('us', tz='UTC')
+        return getattr(pa, ARROW_TYPES[name])()
+
+    return pa.schema([(name, arrow_type(name)) for name in fields])
+
+
+def write_parquet(path, rows, fields, chunk_size):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema(fields)
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+            count += len(chunk)
+    return count
+
+
+def export_table(table, path, fmt='jsonl', chunk_size=2000):
+    """Stream ``table`` to ``path`` and return the number of rows written."""
+    rows = iter_rows(table, chunk_size)
+    if fmt == 'parquet':
+        return write_parquet(path, rows, EXPORTS[table][1], chunk_size)
+    return write_jsonl(path, rows)
+
+
+def read_rows(path):
+    """Iterate the rows of a file written by :func:`export_table`."""
+    path = str(path)
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+    else:
+        with gzip.open(path, 'rt', encoding='utf-8') as source:
+            for line in source:
+                yield json.loads(line)
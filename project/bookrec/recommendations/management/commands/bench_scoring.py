@@ -0,0 +1,45 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from recommendations.scoring import (
+    COMPLEXITIES, MOODS, PERSONALITIES, CandidateFeatures, UserContext,
+    explain_batch, get_profile, rank, score_batch,
+)
+
+
+class Command(BaseCommand):
+    help = "Measure batch scoring throughput on synthetic candidates."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidates', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--profile', default=None)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        n = options['candidates']
+        features = CandidateFeatures(
+            book_ids=np.arange(1, n + 1, dtype=np.int64),
+            mood_codes=rng.integers(0, len(MOODS), n, dtype=np.int16),
+            personality_codes=rng.integers(0, len(PERSONALITIES), n, dtype=np.int16),
+            complexity_codes=rng.integers(0, len(COMPLEXITIES), n, dtype=np.int16),
+            popularity=rng.random(n),
+        )
+        context = UserContext(
+            mood=MOODS[0], intensity=8, personality=PERSONALITIES[0], complexity=COMPLEXITIES[0],
+            liked_ids=np.sort(rng.choice(features.book_ids, size=min(n, 200), replace=False)),
+        )
+        profile = get_profile(options['profile'])
+
+        started = time.perf_counter()
+        for _ in range(options['repeat']):
+            scores = score_batch(context, features, profile)
+            top = rank(scores, 10)
+            explain_batch(context, features, top)
+        elapsed = time.perf_counter() - started
+
+        per_call = elapsed / options['repeat']
+        self.stdout.write(f"{n} candidates: {per_call * 1000:.2f} ms per call ({n / per_call:,.0f} candidates/s)")
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recommendations.moods import compact_moods
+
+
+class Command(BaseCommand):
+    help = "Roll UserMood rows older than the retention window into daily buckets."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, default=settings.MOOD_RETENTION_DAYS)
+
+    def handle(self, *args, **options):
+        deleted = compact_moods(options['retention_days'])
+        self.stdout.write(self.style.SUCCESS(f"Compacted {deleted} mood entr{'y' if deleted == 1 else 'ies'}"))
@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recommendations.evaluation import evaluate
+from recommendations.scoring import UnknownProfile, get_profile
+
+
+class Command(BaseCommand):
+    help = "Replay an export_events directory through the scoring code and report precision/recall@k."
+
+    def add_arguments(self, parser):
+        parser.add_argument('export_dir')
+        parser.add_argument('-k', type=int, default=10)
+        parser.add_argument('--horizon-days', type=float, default=7)
+        parser.add_argument('--profile', default=None)
+        parser.add_argument('--diversity', type=float, default=0)
+
+    def handle(self, *args, **options):
+        try:
+            profile = get_profile(options['profile'])
+        except UnknownProfile:
+            raise CommandError(f"Unknown scoring profile {options['profile']!r}")
+        try:
+            result = evaluate(
+                options['export_dir'],
+                k=options['k'],
+                horizon=timedelta(days=options['horizon_days']),
+                profile=profile,
+                diversity=options['diversity'],
+            )
+        except FileNotFoundError as exc:
+            raise CommandError(str(exc))
+
+        k = result.k
+        self.stdout.write(f"events evaluated: {result.events}")
+        self.stdout.write(f"precision@{k}:     {result.precision:.4f}")
+        self.stdout.write(f"recall@{k}:        {result.recall:.4f}")
+        self.stdout.write(
+            f"scoring:          {result.events_per_second:,.0f} events/s, "
+            f"{result.candidates_per_second:,.0f} candidates/s"
+        )
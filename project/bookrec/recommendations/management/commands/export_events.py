@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recommendations.export import EXPORTS, FORMATS, export_table
+
+
+class Command(BaseCommand):
+    help = "Stream recommendations, interactions and moods to compressed JSONL or Parquet files."
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_dir')
+        parser.add_argument('--format', choices=sorted(FORMATS), default='jsonl')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--tables', nargs='+', choices=sorted(EXPORTS), default=sorted(EXPORTS))
+
+    def handle(self, *args, **options):
+        if options['format'] == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise CommandError("Parquet export needs pyarrow; install it or use --format jsonl.")
+
+        output_dir = Path(options['output_dir'])
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for table in options['tables']:
+            path = output_dir / f"{table}{FORMATS[options['format']]}"
+            count = export_table(table, path, options['format'], options['chunk_size'])
+            self.stdout.write(f"{table}: {count} rows -> {path}")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from recommendations.stats import rebuild_book_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute BookStats from the full interaction log (backfill)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        total = rebuild_book_stats(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt book stats from {total} interaction(s)"))
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from recommendations.stats import update_book_stats
+from recommendations.tasks import run_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute stale recommendations queued by preference edits and interactions, "
+        "and keep book engagement stats up to date."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit once no due tasks are left")
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--poll-interval', type=float, default=5.0, help="Seconds to sleep when idle")
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            done = run_pending(limit=options['batch_size'])
+            if done:
+                self.stdout.write(f"Regenerated {done} recommendation set(s)")
+            consumed = update_book_stats()
+            if consumed:
+                self.stdout.write(f"Folded {consumed} interaction(s) into book stats")
+            if done < options['batch_size']:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recommendations.throttling import reset_shed_counts, shed_counts
+
+
+class Command(BaseCommand):
+    help = "Show how many requests were shed per throttled endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Zero the counters after printing")
+
+    def handle(self, *args, **options):
+        for scope in settings.RECOMMENDATION_THROTTLES:
+            counts = shed_counts(scope)
+            self.stdout.write(f"{scope}: " + ', '.join(f"{outcome}={count}" for outcome, count in counts.items()))
+            if options['reset']:
+                reset_shed_counts(scope)
@@ -0,0 +1,74 @@
+import threading
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookrec.loadtest import RequestLog, run_clients, throwaway_users, unthrottled
+from books.models import Book
+from recommendations.engine import RECOMMENDATION_LIMIT, coalescing_counts, reset_coalescing_counts
+from recommendations.models import Recommendation
+
+STRESS_USER_PREFIX = 'stress-suggest-'
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent identical /suggest/ calls from a thread pool through the in-process test "
+        "client (not over HTTP, so all threads share one process) and report errors, latency, how "
+        "many computations were coalesced, and whether the stored rows match what was returned."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--requests', type=int, default=20, help="Requests per thread")
+        parser.add_argument('--users', type=int, default=2, help="Distinct users sharing the load")
+        parser.add_argument('--moods', type=int, default=2, help="Distinct moods per user")
+
+    def handle(self, *args, **options):
+        if not Book.objects.exists():
+            raise CommandError("No books found; load data first (python initial_data.py).")
+
+        moods = [choice for choice, _ in Book.MOOD_CHOICES][:options['moods']]
+        log = RequestLog()
+        # Distinct (book, score) lists returned per (user, mood); identical requests should agree.
+        returned = defaultdict(set)
+        lock = threading.Lock()
+
+        reset_coalescing_counts()
+        with throwaway_users(STRESS_USER_PREFIX, options['users']) as users, unthrottled():
+            keys = [(user, mood) for user in users for mood in moods]
+
+            def work(index, client, local):
+                local_returned = defaultdict(set)
+                for n in range(options['requests']):
+                    user, mood = keys[(index + n) % len(keys)]
+                    client.force_authenticate(user)
+                    response = local.send(client.post, '/api/recommendations/suggest/', {'mood': mood}, format='json')
+                    if response.status_code == 200:
+                        local_returned[user.pk, mood].add(
+                            frozenset((rec['book'], rec['score']) for rec in response.json())
+                        )
+                with lock:
+                    for key, results in local_returned.items():
+                        returned[key] |= results
+
+            run_clients(options['threads'], work, log, together=True)
+            stored = defaultdict(set)
+            rows = Recommendation.objects.filter(user__in=users).values_list('user', 'current_mood', 'book', 'score')
+            for user_id, mood, book_id, score in rows:
+                stored[user_id, mood].add((book_id, score))
+
+        counts = coalescing_counts()
+        # Identical requests must all return the same list, and the stored rows must be exactly that list.
+        overfull = sum(len(rows) > RECOMMENDATION_LIMIT for rows in stored.values())
+        mismatched = sum(
+            len(results) != 1 or stored[key] != next(iter(results))
+            for key, results in returned.items()
+        )
+        log.write_summary(self.stdout, percentiles=(50, 99))
+        self.stdout.write(f"exceptions: {dict(log.exceptions) or 'none'}")
+        self.stdout.write(f"computed:   {counts['computed']}, coalesced: {counts['coalesced']}")
+        self.stdout.write(f"overfull:   {overfull} (user, mood) pairs with over {RECOMMENDATION_LIMIT} stored rows")
+        self.stdout.write(f"mismatched: {mismatched} (user, mood) pairs whose responses disagree with the stored rows")
+        if log.exceptions or overfull or mismatched:
+            raise CommandError("Concurrent /suggest/ calls failed; see above.")
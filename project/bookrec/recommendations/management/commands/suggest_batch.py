@@ -0,0 +1,57 @@
+import json
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from recommendations.batch import parse_items, suggest_batch
+from recommendations.scoring import UnknownProfile, get_profile
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate recommendations for many (user, mood) pairs. Reads NDJSON objects "
+        "with user_id, mood and optional intensity, and writes one NDJSON result per line."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', nargs='?', default='-', help="NDJSON input file, or - for stdin")
+        parser.add_argument('--output', default='-', help="NDJSON output file, or - for stdout")
+        parser.add_argument('--profile', default=None)
+        parser.add_argument('--diversity', type=float, default=settings.RECOMMENDATION_DEFAULT_DIVERSITY)
+        parser.add_argument('--chunk-size', type=int, default=settings.RECOMMENDATION_BATCH_CHUNK_SIZE)
+        parser.add_argument(
+            '--no-store', action='store_false', dest='store',
+            help="Don't replace the users' stored recommendations",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            profile = get_profile(options['profile'])
+        except UnknownProfile:
+            raise CommandError(f"Unknown scoring profile {options['profile']!r}")
+        if not 0 <= options['diversity'] <= 1:
+            raise CommandError("--diversity must be between 0 and 1")
+
+        source = sys.stdin if options['input'] == '-' else open(options['input'], encoding='utf-8')
+        with source:
+            try:
+                data = [json.loads(line) for line in source if line.strip()]
+            except json.JSONDecodeError as exc:
+                raise CommandError(f"Invalid NDJSON input: {exc}")
+        items, errors = parse_items(data)
+        if errors:
+            raise CommandError(
+                "Invalid input lines: " + ", ".join(f"{position + 1} ({message})" for position, message in errors.items())
+            )
+
+        out = self.stdout if options['output'] == '-' else open(options['output'], 'w', encoding='utf-8')
+        failed = 0
+        with out:
+            for result in suggest_batch(
+                items, profile=profile, diversity=options['diversity'],
+                store=options['store'], chunk_size=options['chunk_size'],
+            ):
+                failed += 'error' in result
+                out.write(json.dumps(result) + '\n')
+        self.stderr.write(f"{len(items)} pairs, {failed} failed")
@@ -24,6 +24,34 @@ class UserMood(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [models.Index(fields=['user', '-timestamp'])]
+
+class MoodSummary(models.Model):
+    """Rolling per-user mood aggregates, updated on every new ``UserMood``."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='mood_summary')
+    total_count = models.PositiveIntegerField(default=0)
+    counts = models.JSONField(default=dict, help_text="Mood -> number of entries")
+    intensity_sums = models.JSONField(default=dict, help_text="Mood -> sum of intensities")
+    recent = models.JSONField(default=list, help_text="Newest-first [id, mood, intensity, timestamp] entries")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user.username}'s mood summary"
+
+class MoodDailyBucket(models.Model):
+    """Daily roll-up of ``UserMood`` rows older than the retention window."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mood_buckets')
+    date = models.DateField()
+    mood = models.CharField(max_length=50, choices=UserMood.MOOD_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+    intensity_sum = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.mood} on {self.date} ({self.count})"
+    
+    class Meta:
+        ordering = ['-date']
+        unique_together = ['user', 'date', 'mood']
 
 class UserPreference(models.Model):
     COMPLEXITY_CHOICES = [
@@ -93,4 +121,37 @@ class UserBookInteraction(models.Model):
         return f"{self.user.username} {self.interaction_type} {self.book.title}"
     
     class Meta:
-        ordering = ['-timestamp']
\ No newline at end of file
+        ordering = ['-timestamp']
+
+class RecommendationTask(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='recommendation_tasks')
+    mood = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    run_after = models.DateTimeField(db_index=True, help_text="Earliest run time, or lease deadline while running")
+    attempts = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Regenerate {self.mood} for {self.user.username} ({self.status})"
+
+    class Meta:
+        ordering = ['run_after']
+        unique_together = ['user', 'mood']
+
+
+class CatalogueVersion(models.Model):
+    """Single row counting catalogue changes.
+
+    Every process compares it with the version of its in-memory catalogue
+    index (see ``recommendations.catalogue``), so it must live somewhere all
+    processes share.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Catalogue version {self.version}"
@@ -0,0 +1,137 @@
+"""
+Mood analytics.
+
+``MoodSummary`` holds each user's running mood counts, intensity sums and a
+last-N window. It is updated by one read-modify-write per new ``UserMood``,
+so the summary endpoint never scans the mood history. Old raw rows are
+periodically rolled into ``MoodDailyBucket`` by :func:`compact_moods`; the
+summary already includes them, so compaction doesn't touch it.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import MoodDailyBucket, MoodSummary, UserMood
+
+
+def record_mood(user_mood):
+    """Fold a newly created ``UserMood`` into its user's summary."""
+    MoodSummary.objects.get_or_create(user_id=user_mood.user_id)
+    with transaction.atomic():
+        # Write before reading: the counter bump takes the row lock (or, on
+        # SQLite, the database write lock, waiting out the busy timeout) so
+        # the read-modify-write below never has to upgrade a read lock.
+        MoodSummary.objects.filter(user_id=user_mood.user_id).update(total_count=F('total_count') + 1)
+        summary = MoodSummary.objects.get(user_id=user_mood.user_id)
+        mood = user_mood.mood
+        summary.counts[mood] = summary.counts.get(mood, 0) + 1
+        summary.intensity_sums[mood] = summary.intensity_sums.get(mood, 0) + int(user_mood.intensity)
+        entry = [user_mood.pk, mood, int(user_mood.intensity), user_mood.timestamp.isoformat()]
+        summary.recent = [entry] + summary.recent[:settings.MOOD_SUMMARY_RECENT - 1]
+        summary.save(update_fields=['counts', 'intensity_sums', 'recent'])
+
+
+def rebuild_mood_summary(user):
+    """Recompute ``user``'s summary from raw rows and daily buckets.
+
+    Used after a mood entry is edited or deleted, which the incremental path
+    can't express.
+    """
+    counts = defaultdict(int)
+    intensity_sums = defaultdict(int)
+    raw = (
+        UserMood.objects.filter(user=user)
+        .values('mood')
+        .annotate(count=Count('id'), intensity_sum=Sum('intensity'))
+        .order_by()
+    )
+    buckets = (
+        MoodDailyBucket.objects.filter(user=user)
+        .values('mood')
+        .annotate(count=Sum('count'), intensity_sum=Sum('intensity_sum'))
+        .order_by()
+    )
+    for row in list(raw) + list(buckets):
+        counts[row['mood']] += row['count']
+        intensity_sums[row['mood']] += row['intensity_sum']
+    recent = [
+        [pk, mood, intensity, timestamp.isoformat()]
+        for pk, mood, intensity, timestamp in UserMood.objects.filter(user=user)
+        .values_list('id', 'mood', 'intensity', 'timestamp')[:settings.MOOD_SUMMARY_RECENT]
+    ]
+    MoodSummary.objects.update_or_create(user=user, defaults={
+        'total_count': sum(counts.values()),
+        'counts': dict(counts),
+        'intensity_sums': dict(intensity_sums),
+        'recent': recent,
+    })
+
+
+def summarize(summary):
+    """Shape a ``MoodSummary`` (or ``None``) for the API."""
+    if summary is None:
+        return {'total': 0, 'distribution': {}, 'counts': {}, 'average_intensity': {}, 'recent': []}
+    total = summary.total_count
+    return {
+        'total': total,
+        'distribution': {mood: count / total for mood, count in summary.counts.items()} if total else {},
+        'counts': summary.counts,
+        'average_intensity': {
+            mood: summary.intensity_sums.get(mood, 0) / count
+            for mood, count in summary.counts.items() if count
+        },
+        'recent': [
+            {'id': pk, 'mood': mood, 'intensity': intensity, 'timestamp': timestamp}
+            for pk, mood, intensity, timestamp in summary.recent
+        ],
+    }
+
+
+def compact_moods(retention_days=None, batch_size=1000):
+    """Roll raw mood rows older than the retention window into daily buckets.
+
+    Returns the number of raw rows removed.
+    """
+    if retention_days is None:
+        retention_days = settings.MOOD_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    with transaction.atomic():
+        old = UserMood.objects.filter(timestamp__lt=cutoff)
+        grouped = list(
+            old.annotate(date=TruncDate('timestamp'))
+            .values('user_id', 'date', 'mood')
+            .annotate(count=Count('id'), intensity_sum=Sum('intensity'))
+            .order_by('user_id', 'date', 'mood')
+        )
+        for start in range(0, len(grouped), batch_size):
+            chunk = grouped[start:start + batch_size]
+            existing = {
+                (bucket.user_id, bucket.date, bucket.mood): bucket
+                for bucket in MoodDailyBucket.objects.filter(
+                    user_id__in={row['user_id'] for row in chunk},
+                    date__in={row['date'] for row in chunk},
+                )
+            }
+            buckets = []
+            for row in chunk:
+                previous = existing.get((row['user_id'], row['date'], row['mood']))
+                buckets.append(MoodDailyBucket(
+                    user_id=row['user_id'],
+                    date=row['date'],
+                    mood=row['mood'],
+                    count=row['count'] + (previous.count if previous else 0),
+                    intensity_sum=row['intensity_sum'] + (previous.intensity_sum if previous else 0),
+                ))
+            MoodDailyBucket.objects.bulk_create(
+                buckets,
+                update_conflicts=True,
+                unique_fields=['user', 'date', 'mood'],
+                update_fields=['count', 'intensity_sum'],
+            )
+        deleted, _ = old.delete()
+    return deleted
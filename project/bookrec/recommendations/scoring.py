@@ -0,0 +1,202 @@
+"""
+Vectorised recommendation scoring.
+
+Books are described by small integer feature codes (index into the model's
+choice lists) so a whole candidate set can be scored with a handful of NumPy
+operations. The same API serves ``GetRecommendationsView``, the regeneration
+worker and offline benchmarks:
+
+    features = CandidateFeatures.from_rows(rows)
+    scores = score_batch(context, features, get_profile())
+    reasons = explain_batch(context, features, top_indices)
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+from django.conf import settings
+
+from books.models import Book
+
+MOODS = [choice for choice, _ in Book.MOOD_CHOICES]
+PERSONALITIES = [choice for choice, _ in Book.PERSONALITY_MATCH_CHOICES]
+COMPLEXITIES = [choice for choice, _ in Book.COMPLEXITY_CHOICES]
+
+MOOD_CODES = {value: code for code, value in enumerate(MOODS)}
+PERSONALITY_CODES = {value: code for code, value in enumerate(PERSONALITIES)}
+COMPLEXITY_CODES = {value: code for code, value in enumerate(COMPLEXITIES)}
+
+# Code for a missing or unknown value; never equal to a real feature code.
+UNKNOWN = -1
+
+
+def encode(codes, value):
+    return codes.get(value, UNKNOWN)
+
+
+@dataclass(frozen=True)
+class WeightProfile:
+    base: float = 50
+    mood: float = 20
+    personality: float = 15
+    complexity: float = 10
+    liked: float = 5
+    popularity: float = 0
+    # How strongly mood intensity scales the mood weight: intensity 1 gives
+    # (1 - gain) and intensity 10 gives (1 + gain) times the weight; 5 is neutral.
+    intensity_gain: float = 0.5
+    max_score: float = 100
+
+
+class UnknownProfile(KeyError):
+    pass
+
+
+def get_profile(name=None):
+    """Return the named weight profile from ``settings.RECOMMENDATION_WEIGHT_PROFILES``."""
+    name = name or settings.RECOMMENDATION_WEIGHT_PROFILE
+    try:
+        return WeightProfile(**settings.RECOMMENDATION_WEIGHT_PROFILES[name])
+    except KeyError:
+        raise UnknownProfile(name) from None
+
+
+@dataclass
+class UserContext:
+    mood: str
+    intensity: int = 5
+    personality: str = None
+    complexity: str = None
+    liked_ids: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+
+    @classmethod
+    def build(cls, mood, intensity=5, preferences=None, liked_ids=()):
+        return cls(
+            mood=mood,
+            intensity=clamp_intensity(intensity),
+            personality=preferences.personality_traits if preferences else None,
+            complexity=preferences.preferred_complexity if preferences else None,
+            liked_ids=np.asarray(sorted(liked_ids), dtype=np.int64),
+        )
+
+    @property
+    def mood_code(self):
+        return encode(MOOD_CODES, self.mood)
+
+    @property
+    def personality_code(self):
+        return encode(PERSONALITY_CODES, self.personality)
+
+    @property
+    def complexity_code(self):
+        return encode(COMPLEXITY_CODES, self.complexity)
+
+
+def clamp_intensity(intensity):
+    try:
+        return min(max(int(intensity), 1), 10)
+    except (TypeError, ValueError):
+        return 5
+
+
+def intensity_multiplier(intensity, gain):
+    return 1 + gain * (clamp_intensity(intensity) - 5) / 5
+
+
+@dataclass
+class CandidateFeatures:
+    book_ids: np.ndarray
+    mood_codes: np.ndarray
+    personality_codes: np.ndarray
+    complexity_codes: np.ndarray
+    popularity: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows, popularity=None):
+        """Build from ``(id, suitable_moods, personality_match, complexity)`` rows.
+
+        ``popularity`` optionally maps book id to a 0..1 prior.
+        """
+        rows = list(rows)
+        popularity = popularity or {}
+        return cls(
+            book_ids=np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)),
+            mood_codes=np.fromiter((encode(MOOD_CODES, row[1]) for row in rows), dtype=np.int16, count=len(rows)),
+            personality_codes=np.fromiter(
+                (encode(PERSONALITY_CODES, row[2]) for row in rows), dtype=np.int16, count=len(rows)
+            ),
+            complexity_codes=np.fromiter(
+                (encode(COMPLEXITY_CODES, row[3]) for row in rows), dtype=np.int16, count=len(rows)
+            ),
+            popularity=np.fromiter((popularity.get(row[0], 0.0) for row in rows), dtype=np.float64, count=len(rows)),
+        )
+
+    def __len__(self):
+        return len(self.book_ids)
+
+    def subset(self, selector):
+        """Features for the rows picked by a boolean mask or index array."""
+        return CandidateFeatures(
+            book_ids=self.book_ids[selector],
+            mood_codes=self.mood_codes[selector],
+            personality_codes=self.personality_codes[selector],
+            complexity_codes=self.complexity_codes[selector],
+            popularity=self.popularity[selector],
+        )
+
+
+def score_batch(context, features, profile=None):
+    """Score every candidate for ``context`` in one pass and return a float64 vector."""
+    profile = profile or get_profile()
+    scores = np.full(len(features), profile.base, dtype=np.float64)
+    mood_weight = profile.mood * intensity_multiplier(context.intensity, profile.intensity_gain)
+    scores += mood_weight * (features.mood_codes == context.mood_code)
+    if context.personality_code != UNKNOWN:
+        scores += profile.personality * (features.personality_codes == context.personality_code)
+    if context.complexity_code != UNKNOWN:
+        scores += profile.complexity * (features.complexity_codes == context.complexity_code)
+    if len(context.liked_ids):
+        scores += profile.liked * np.isin(features.book_ids, context.liked_ids)
+    if profile.popularity:
+        scores += profile.popularity * features.popularity
+    np.minimum(scores, profile.max_score, out=scores)
+    return scores
+
+
+def rank(scores, limit):
+    """Indices of the ``limit`` best scores; ties keep candidate order."""
+    order = np.argsort(-scores, kind='stable')
+    return order[:limit]
+
+
+def explain(context, mood_match, personality_match, complexity_match, liked):
+    clauses = []
+    if mood_match:
+        strength = 'strong ' if context.intensity >= 8 else ''
+        clauses.append(f"your current {strength}{context.mood} mood")
+    if personality_match:
+        clauses.append(f"your {context.personality} personality")
+    if complexity_match:
+        clauses.append(f"your preference for {context.complexity} reads")
+    if liked:
+        clauses.append("a book you liked")
+    if not clauses:
+        return "This book is a good fit for your reading profile"
+    if len(clauses) == 1:
+        return f"This book matches {clauses[0]}"
+    return f"This book matches {', '.join(clauses[:-1])} and {clauses[-1]}"
+
+
+def explain_batch(context, features, indices):
+    """Deterministic reason strings for the candidates at ``indices``."""
+    mood_match = features.mood_codes[indices] == context.mood_code
+    personality_match = (features.personality_codes[indices] == context.personality_code) & (
+        context.personality_code != UNKNOWN
+    )
+    complexity_match = (features.complexity_codes[indices] == context.complexity_code) & (
+        context.complexity_code != UNKNOWN
+    )
+    liked = np.isin(features.book_ids[indices], context.liked_ids)
+    return [
+        explain(context, *flags)
+        for flags in zip(mood_match.tolist(), personality_match.tolist(), complexity_match.tolist(), liked.tolist())
+    ]
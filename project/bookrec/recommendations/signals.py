@@ -0,0 +1,39 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from books.models import Book
+from .exclusions import EXCLUDING_INTERACTIONS, invalidate_excluded_books
+from .models import Recommendation, UserBookInteraction, UserMood
+from .moods import record_mood
+
+
+@receiver(post_save, sender=UserBookInteraction)
+def interaction_saved(sender, instance, created, **kwargs):
+    if instance.interaction_type not in EXCLUDING_INTERACTIONS:
+        return
+    # Dropped rather than edited in place: a read-modify-write of the cached
+    # set can lose ids when two interactions are saved at once.
+    invalidate_excluded_books(instance.user_id)
+    # Drop stored suggestions for the book so listings stop showing it right away.
+    Recommendation.objects.filter(user_id=instance.user_id, book_id=instance.book_id).delete()
+
+
+@receiver(post_delete, sender=UserBookInteraction)
+def interaction_deleted(sender, instance, **kwargs):
+    invalidate_excluded_books(instance.user_id)
+
+
+@receiver(post_save, sender=UserMood)
+def mood_saved(sender, instance, created, **kwargs):
+    # Edits go through UserMoodDetailView, which rebuilds the summary itself.
+    if created:
+        record_mood(instance)
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+@receiver(m2m_changed, sender=Book.genres.through)
+def catalogue_changed(sender, **kwargs):
+    from .catalogue import invalidate_catalogue_index
+
+    invalidate_catalogue_index()
@@ -0,0 +1,116 @@
+"""
+Incremental maintenance of ``books.BookStats`` from ``UserBookInteraction``.
+
+Instead of grouping over the whole interaction table, each call to
+:func:`update_book_stats` consumes the interactions added since the last
+checkpoint, folds them into per-book deltas in memory and applies one
+``UPDATE`` per touched book. Trending scores decay exponentially: all scores
+are scaled down to the current time in a single statement before the new
+batch's contributions are added.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from books.models import BookStats, BookStatsCheckpoint
+from .models import UserBookInteraction
+
+COUNTER_FIELDS = {
+    'view': 'view_count',
+    'save': 'save_count',
+    'read': 'read_count',
+    'like': 'like_count',
+    'dislike': 'dislike_count',
+    'rate': 'rate_count',
+}
+
+
+def decay_factor(seconds):
+    half_life = settings.BOOK_TRENDING_HALF_LIFE * 3600
+    return 0.5 ** (seconds / half_life)
+
+
+def update_book_stats(batch_size=None):
+    """Fold the next batch of new interactions into ``BookStats``.
+
+    Returns the number of interactions consumed.
+    """
+    batch_size = batch_size or settings.BOOK_STATS_BATCH_SIZE
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settings.BOOK_STATS_GRACE_SECONDS)
+
+    with transaction.atomic():
+        checkpoint, _ = BookStatsCheckpoint.objects.select_for_update().get_or_create(
+            pk=1, defaults={'decayed_at': now}
+        )
+        rows = list(
+            UserBookInteraction.objects
+            .filter(id__gt=checkpoint.last_interaction_id)
+            .order_by('id')
+            .values_list('id', 'book_id', 'interaction_type', 'rating', 'timestamp')[:batch_size]
+        )
+        # Stop at the first row inside the grace window. Skipping it and
+        # checkpointing past it would lose it for good.
+        for position, row in enumerate(rows):
+            if row[4] >= cutoff:
+                rows = rows[:position]
+                break
+        if not rows:
+            return 0
+
+        elapsed = (now - checkpoint.decayed_at).total_seconds()
+        if elapsed > 0:
+            BookStats.objects.update(trending_score=F('trending_score') * decay_factor(elapsed))
+
+        weights = settings.BOOK_TRENDING_WEIGHTS
+        deltas = defaultdict(lambda: defaultdict(float))
+        for _, book_id, interaction_type, rating, timestamp in rows:
+            delta = deltas[book_id]
+            field = COUNTER_FIELDS.get(interaction_type)
+            if field:
+                delta[field] += 1
+            if rating is not None:
+                delta['rating_sum'] += rating
+                delta['rating_count'] += 1
+            delta['trending_score'] += (
+                weights.get(interaction_type, 0) * decay_factor((now - timestamp).total_seconds())
+            )
+
+        BookStats.objects.bulk_create(
+            [BookStats(book_id=book_id) for book_id in deltas], ignore_conflicts=True
+        )
+        for book_id, delta in deltas.items():
+            BookStats.objects.filter(book_id=book_id).update(**{
+                field: F(field) + (value if field == 'trending_score' else int(value))
+                for field, value in delta.items()
+            })
+        rated = [book_id for book_id, delta in deltas.items() if delta.get('rating_count')]
+        if rated:
+            BookStats.objects.filter(book_id__in=rated).update(
+                average_rating=Cast('rating_sum', FloatField()) / F('rating_count')
+            )
+
+        checkpoint.last_interaction_id = rows[-1][0]
+        checkpoint.decayed_at = now
+        checkpoint.save()
+    return len(rows)
+
+
+def rebuild_book_stats(batch_size=None):
+    """Drop all stats and replay the full interaction log. Returns interactions consumed."""
+    with transaction.atomic():
+        BookStats.objects.all().delete()
+        BookStatsCheckpoint.objects.update_or_create(
+            pk=1, defaults={'last_interaction_id': 0, 'decayed_at': timezone.now()}
+        )
+    total = 0
+    while True:
+        consumed = update_book_stats(batch_size)
+        if not consumed:
+            return total
+        total += consumed
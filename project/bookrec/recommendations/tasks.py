@@ -0,0 +1,122 @@
+"""
+Database-backed queue for regenerating stale recommendations.
+
+HTTP handlers call :func:`enqueue_regeneration`, which upserts one
+``RecommendationTask`` row per (user, mood) and pushes its ``run_after`` back
+by ``RECOMMENDATION_REGEN_DELAY`` seconds. Repeated edits inside that window
+therefore collapse into a single job. The push-back stops at
+``RECOMMENDATION_REGEN_MAX_DELAY`` after the job was first queued, so a user
+who keeps making changes still gets fresh recommendations.
+``manage.py run_recommendation_worker`` picks up due rows and recomputes the
+recommendations off the request path.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import DateTimeField, F, Value
+from django.db.models.functions import Least
+from django.utils import timezone
+
+from bookrec.routers import use_primary
+from .exclusions import EXCLUDING_INTERACTIONS, load_excluded_book_ids
+from .models import Recommendation, RecommendationTask, UserMood
+
+logger = logging.getLogger(__name__)
+
+# Interaction types the scorer reads: likes, and read/dislike exclusions.
+REGENERATING_INTERACTIONS = ('like',) + EXCLUDING_INTERACTIONS
+
+
+def enqueue_regeneration(user, moods=None):
+    """Schedule regeneration of ``user``'s recommendations.
+
+    ``moods`` defaults to every mood the user currently has recommendations for.
+    Returns the number of (user, mood) jobs scheduled.
+    """
+    if moods is None:
+        moods = (
+            Recommendation.objects.filter(user=user)
+            .exclude(current_mood__isnull=True)
+            .values_list('current_mood', flat=True)
+            .distinct()
+        )
+    moods = sorted(set(moods))
+    if not moods:
+        return 0
+    now = timezone.now()
+    run_after = now + timedelta(seconds=settings.RECOMMENDATION_REGEN_DELAY)
+    RecommendationTask.objects.bulk_create(
+        [
+            RecommendationTask(user=user, mood=mood, status='pending', run_after=run_after, attempts=0)
+            for mood in moods
+        ],
+        ignore_conflicts=True,
+    )
+    tasks = RecommendationTask.objects.filter(user=user, mood__in=moods)
+    # Waiting jobs are pushed back, but never past their maximum delay.
+    tasks.filter(status='pending').update(run_after=Least(
+        Value(run_after, output_field=DateTimeField()),
+        F('created_at') + timedelta(seconds=settings.RECOMMENDATION_REGEN_MAX_DELAY),
+        output_field=DateTimeField(),
+    ))
+    # A job being worked on may have read the old data; queue it again as new.
+    tasks.filter(status='running').update(status='pending', run_after=run_after, attempts=0, created_at=now)
+    return len(moods)
+
+
+def claim_due_tasks(limit):
+    """Lease up to ``limit`` due tasks to this worker.
+
+    A claimed task's ``run_after`` becomes its lease deadline, so tasks left
+    behind by a crashed worker become due again once the lease expires.
+    """
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=settings.RECOMMENDATION_TASK_LEASE)
+    claimed = []
+    for task in RecommendationTask.objects.select_related('user').filter(run_after__lte=now)[:limit]:
+        updated = RecommendationTask.objects.filter(
+            pk=task.pk, status=task.status, run_after=task.run_after
+        ).update(status='running', run_after=lease_until, attempts=F('attempts') + 1)
+        if updated:
+            task.status = 'running'
+            task.run_after = lease_until
+            task.attempts += 1
+            claimed.append(task)
+    return claimed
+
+
+def run_task(task):
+    from .engine import generate_recommendations
+
+    with use_primary():
+        # Regenerate at the intensity the user last reported for this mood.
+        intensity = UserMood.objects.filter(
+            user=task.user, mood=task.mood
+        ).values_list('intensity', flat=True).first()
+        # This process's exclusion cache may predate interactions saved by
+        # the web workers, so read the set from the database.
+        generate_recommendations(
+            task.user, task.mood, intensity or 5, excluded_ids=load_excluded_book_ids(task.user_id)
+        )
+    # Only drop the row if nobody re-enqueued it while we were working.
+    RecommendationTask.objects.filter(
+        pk=task.pk, status='running', run_after=task.run_after
+    ).delete()
+
+
+def run_pending(limit=100):
+    """Process up to ``limit`` due tasks and return how many succeeded."""
+    done = 0
+    for task in claim_due_tasks(limit):
+        if task.attempts > settings.RECOMMENDATION_TASK_MAX_ATTEMPTS:
+            logger.error("Dropping recommendation task %s after %s attempts", task.pk, task.attempts)
+            RecommendationTask.objects.filter(pk=task.pk).delete()
+            continue
+        try:
+            run_task(task)
+        except Exception:
+            logger.exception("Recommendation task %s failed", task.pk)
+        else:
+            done += 1
+    return done
@@ -0,0 +1,110 @@
+"""
+Token-bucket rate limiting and load shedding for expensive endpoints.
+
+Budgets live in ``settings.RECOMMENDATION_THROTTLES`` per scope, each with a
+per-user and a per-endpoint bucket. The per-user bucket is enforced as a DRF
+throttle (429). The endpoint-wide bucket signals overload, and views respond
+by serving stored results instead of recomputing. Bucket state lives in the
+configured cache. Concurrent updates from different workers may
+occasionally let an extra request through, which is acceptable for load
+shedding.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(self, key, capacity, refill_per_second):
+        self.key = key
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+
+    def consume(self, now=None):
+        """Take one token. Returns ``(allowed, seconds until a token is available)``."""
+        now = time.time() if now is None else now
+        tokens, updated = cache.get(self.key) or (self.capacity, now)
+        tokens = min(self.capacity, tokens + (now - updated) * self.refill_per_second)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # Keep the state until the bucket would have refilled anyway.
+        timeout = max(1, int(self.capacity / self.refill_per_second) + 1)
+        cache.set(self.key, (tokens, now), timeout)
+        wait = 0 if allowed else (1 - tokens) / self.refill_per_second
+        return allowed, wait
+
+
+def get_bucket(scope, kind, ident=''):
+    config = settings.RECOMMENDATION_THROTTLES[scope][kind]
+    return TokenBucket(
+        f'throttle:{scope}:{kind}:{ident}', config['capacity'], config['refill_per_second']
+    )
+
+
+class TokenBucketUserThrottle(BaseThrottle):
+    """Per-user (or per-IP for anonymous requests) token bucket for ``scope``."""
+    scope = None
+
+    def allow_request(self, request, view):
+        user = request.user
+        ident = f'user-{user.pk}' if user and user.is_authenticated else f'ip-{self.get_ident(request)}'
+        allowed, self._wait = get_bucket(self.scope, 'user', ident).consume()
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class SuggestUserThrottle(TokenBucketUserThrottle):
+    scope = 'suggest'
+
+
+# A budget that never runs out, for benchmarks that measure the database
+# rather than the throttle.
+UNLIMITED = {'capacity': 10 ** 9, 'refill_per_second': 10 ** 9}
+
+
+def unlimited_throttles():
+    """``RECOMMENDATION_THROTTLES`` with every bucket set to :data:`UNLIMITED`."""
+    return {
+        scope: {kind: UNLIMITED for kind in buckets}
+        for scope, buckets in settings.RECOMMENDATION_THROTTLES.items()
+    }
+
+
+def endpoint_has_capacity(scope):
+    """Consume from the endpoint-wide bucket; False means the endpoint is overloaded."""
+    allowed, _ = get_bucket(scope, 'endpoint').consume()
+    return allowed
+
+
+SHED_OUTCOMES = ('served_stored', 'rejected')
+
+
+def shed_key(scope, outcome):
+    return f'shed:{scope}:{outcome}'
+
+
+def record_shed(scope, outcome):
+    key = shed_key(scope, outcome)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(); start counting again.
+        cache.set(key, 1, None)
+    logger.warning("Shed %s request (%s)", scope, outcome)
+
+
+def shed_counts(scope):
+    return {outcome: cache.get(shed_key(scope, outcome), 0) for outcome in SHED_OUTCOMES}
+
+
+def reset_shed_counts(scope):
+    cache.delete_many([shed_key(scope, outcome) for outcome in SHED_OUTCOMES])
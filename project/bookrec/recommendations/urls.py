@@ -4,8 +4,10 @@ from . import views
 urlpatterns = [
     path('', views.RecommendationListView.as_view(), name='recommendation-list'),
     path('moods/', views.UserMoodCreateView.as_view(), name='mood-create'),
+    path('moods/summary/', views.MoodSummaryView.as_view(), name='mood-summary'),
     path('moods/<int:pk>/', views.UserMoodDetailView.as_view(), name='mood-detail'),
     path('preferences/', views.UserPreferenceView.as_view(), name='user-preferences'),
     path('interactions/', views.UserBookInteractionCreateView.as_view(), name='book-interaction-create'),
     path('suggest/', views.GetRecommendationsView.as_view(), name='get-recommendations'),
+    path('suggest/batch/', views.BatchRecommendationsView.as_view(), name='batch-recommendations'),
 ]
\ No newline at end of file
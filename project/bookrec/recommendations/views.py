@@ -1,9 +1,14 @@
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Q
-from .models import UserMood, UserPreference, Recommendation, UserBookInteraction
-from books.models import Book
+from .models import UserMood, UserPreference, Recommendation, UserBookInteraction, MoodSummary
+from .moods import rebuild_mood_summary, summarize
+from .tasks import REGENERATING_INTERACTIONS, enqueue_regeneration
+from .throttling import SuggestUserThrottle, endpoint_has_capacity, record_shed
 from .serializers import (
     UserMoodSerializer, UserPreferenceSerializer, 
     RecommendationSerializer, UserBookInteractionSerializer
@@ -24,14 +29,41 @@ class UserMoodDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def get_queryset(self):
         return UserMood.objects.filter(user=self.request.user)
+    
+    def perform_update(self, serializer):
+        serializer.save()
+        rebuild_mood_summary(self.request.user)
+    
+    def perform_destroy(self, instance):
+        instance.delete()
+        rebuild_mood_summary(self.request.user)
+
+class MoodSummaryView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        summary = MoodSummary.objects.filter(user=request.user).first()
+        return Response(summarize(summary))
 
 class UserPreferenceView(generics.RetrieveUpdateAPIView):
     serializer_class = UserPreferenceSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
+        # request.user.preference is preloaded by CachedTokenAuthentication, but
+        # may be a snapshot up to AUTH_TOKEN_CACHE_TTL old: only reads use it,
+        # so an update never writes back fields another worker has changed.
+        if self.request.method in permissions.SAFE_METHODS:
+            try:
+                return self.request.user.preference
+            except UserPreference.DoesNotExist:
+                pass
         obj, created = UserPreference.objects.get_or_create(user=self.request.user)
         return obj
+    
+    def perform_update(self, serializer):
+        serializer.save()
+        enqueue_regeneration(self.request.user)
 
 class UserBookInteractionCreateView(generics.CreateAPIView):
     queryset = UserBookInteraction.objects.all()
@@ -39,7 +71,9 @@ class UserBookInteractionCreateView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        interaction = serializer.save(user=self.request.user)
+        if interaction.interaction_type in REGENERATING_INTERACTIONS:
+            enqueue_regeneration(self.request.user)
 
 class RecommendationListView(generics.ListAPIView):
     serializer_class = RecommendationSerializer
@@ -50,8 +84,13 @@ class RecommendationListView(generics.ListAPIView):
 
 class GetRecommendationsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [SuggestUserThrottle]
     
     def post(self, request):
+        # Scoring pulls in NumPy; keep it off the import path of other views.
+        from .engine import coalesced_recommendations
+        from .scoring import UnknownProfile, clamp_intensity, get_profile
+        
         mood = request.data.get('mood')
         if not mood:
             return Response(
@@ -59,91 +98,111 @@ class GetRecommendationsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        try:
+            profile = get_profile(request.data.get('profile'))
+        except UnknownProfile:
+            return Response(
+                {"error": "Unknown scoring profile"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        intensity = clamp_intensity(request.data.get('intensity', 5))
+        try:
+            diversity = float(request.data.get('diversity', settings.RECOMMENDATION_DEFAULT_DIVERSITY))
+        except (TypeError, ValueError):
+            diversity = -1
+        if not 0 <= diversity <= 1:
+            return Response(
+                {"error": "diversity must be a number between 0 and 1"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Under overload, serve what we computed last time instead of recomputing
+        if not endpoint_has_capacity('suggest'):
+            return self.shed(request, mood)
+        
         # Save the current mood
         UserMood.objects.create(
             user=request.user,
             mood=mood,
-            intensity=request.data.get('intensity', 5)
+            intensity=intensity
         )
         
-        # Get user preferences or use defaults
-        try:
-            preferences = UserPreference.objects.get(user=request.user)
-        except UserPreference.DoesNotExist:
-            # Default to medium complexity and creative personality if no preferences set
-            preferences = None
+        # Concurrent identical requests share one computation and upsert
+        recommendations = coalesced_recommendations(
+            request.user, mood, intensity, profile=profile, diversity=diversity
+        )
         
-        # Build query based on mood and preferences
-        query = Q(suitable_moods=mood)
+        # Return serialized recommendations
+        serializer = RecommendationSerializer(recommendations, many=True)
+        return Response(serializer.data)
+    
+    def shed(self, request, mood):
+        from .engine import RECOMMENDATION_LIMIT
         
-        if preferences:
-            # Add personality match if available
-            if preferences.personality_traits:
-                query |= Q(personality_match=preferences.personality_traits)
-            
-            # Add complexity preference if available
-            if preferences.preferred_complexity:
-                query |= Q(complexity=preferences.preferred_complexity)
-            
-            # Filter by favorite genres if they exist
-            if preferences.favorite_genres.exists():
-                genre_ids = preferences.favorite_genres.values_list('id', flat=True)
-                query &= Q(genres__id__in=genre_ids)
+        stored = (
+            Recommendation.objects.filter(user=request.user, current_mood=mood)
+            .select_related('book__author')
+            .prefetch_related('book__genres')
+            .order_by('-score')[:RECOMMENDATION_LIMIT]
+        )
+        if not stored:
+            record_shed('suggest', 'rejected')
+            return Response(
+                {"error": "Recommendations are temporarily unavailable, please retry shortly"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': '1'}
+            )
+        record_shed('suggest', 'served_stored')
+        serializer = RecommendationSerializer(stored, many=True)
+        return Response(serializer.data, headers={'X-Recommendations-Stored': 'true'})
+
+class BatchRecommendationsView(APIView):
+    """Recommendations for many users and moods, streamed back as NDJSON.
+
+    Expects ``{"requests": [{"user_id": 1, "mood": "happy", "intensity": 7}, ...]}``
+    plus optional ``profile``, ``diversity`` and ``store`` (default true).
+    """
+    permission_classes = [permissions.IsAdminUser]
+    
+    def post(self, request):
+        from .batch import parse_items, suggest_batch
+        from .scoring import UnknownProfile, get_profile
         
-        # Get books matching the criteria
-        matching_books = Book.objects.filter(query).distinct()
+        data = request.data.get('requests')
+        if not isinstance(data, list) or not data:
+            return Response(
+                {"error": "requests must be a non-empty list"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(data) > settings.RECOMMENDATION_BATCH_MAX_ITEMS:
+            return Response(
+                {"error": f"At most {settings.RECOMMENDATION_BATCH_MAX_ITEMS} requests per batch"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        items, errors = parse_items(data)
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Create recommendations
-        recommendations = []
-        for book in matching_books[:10]:  # Limit to top 10
-            # Calculate recommendation score (simplified algorithm)
-            score = 50  # Base score
-            
-            # Mood match increases score
-            if book.suitable_moods == mood:
-                score += 20
-            
-            # Personality match increases score if preferences exist
-            if preferences and book.personality_match == preferences.personality_traits:
-                score += 15
-            
-            # Complexity match increases score if preferences exist
-            if preferences and book.complexity == preferences.preferred_complexity:
-                score += 10
-            
-            # Previous interactions can affect score
-            interactions = UserBookInteraction.objects.filter(
-                user=request.user, book=book
+        try:
+            profile = get_profile(request.data.get('profile'))
+        except UnknownProfile:
+            return Response(
+                {"error": "Unknown scoring profile"},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            
-            # If user previously liked the book, boost score
-            if interactions.filter(interaction_type='like').exists():
-                score += 5
-            
-            # Cap score at 100
-            score = min(score, 100)
-            
-            # Generate reason for recommendation
-            reason = f"This book matches your current {mood} mood"
-            if preferences and book.personality_match == preferences.personality_traits:
-                reason += f" and your {preferences.personality_traits} personality"
-            
-            # Create or update recommendation
-            rec, created = Recommendation.objects.update_or_create(
-                user=request.user,
-                book=book,
-                current_mood=mood,
-                defaults={
-                    'score': score,
-                    'reason': reason,
-                    'is_read': False
-                }
+        try:
+            diversity = float(request.data.get('diversity', settings.RECOMMENDATION_DEFAULT_DIVERSITY))
+        except (TypeError, ValueError):
+            diversity = -1
+        if not 0 <= diversity <= 1:
+            return Response(
+                {"error": "diversity must be a number between 0 and 1"},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            recommendations.append(rec)
+        store = request.data.get('store', True) is not False
         
-        # Return serialized recommendations
-        serializer = RecommendationSerializer(
-            sorted(recommendations, key=lambda x: x.score, reverse=True),
-            many=True
+        results = suggest_batch(items, profile=profile, diversity=diversity, store=store)
+        return StreamingHttpResponse(
+            (json.dumps(result) + '\n' for result in results),
+            content_type='application/x-ndjson'
         )
-        return Response(serializer.data)
\ No newline at end of file
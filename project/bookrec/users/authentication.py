@@ -0,0 +1,140 @@
+"""
+Token authentication with a per-process cache.
+
+DRF's ``TokenAuthentication`` joins ``authtoken_token`` to ``auth_user`` on
+every request, and the views then fetch the user's profile and preferences
+separately. ``CachedTokenAuthentication`` loads all of that in one query and
+keeps it in a bounded TTL cache keyed by token, so a warm authenticated
+request starts with zero auth queries. Each hit returns fresh copies of the
+cached objects. Entries are dropped when the token is deleted or the user,
+profile or preference row changes (see ``users.signals``). Other processes
+learn about such a change from a per-user revocation counter in the default
+cache, which is checked on every hit. This works across workers only with a
+shared cache (REDIS_URL); otherwise the TTL bounds how long another worker's
+cache may stay stale.
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+def revocation_key(user_id):
+    return f'auth-revoked:{user_id}'
+
+
+def revocation_counter(user_id):
+    return cache.get(revocation_key(user_id), 0)
+
+
+def revoke_cached_tokens(user_id):
+    """Make every process drop its cached tokens for ``user_id`` on next use."""
+    key = revocation_key(user_id)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(); any new value differs from the old one.
+        cache.set(key, 1, None)
+
+
+class TokenCache:
+    """Thread-safe LRU cache whose entries expire ``ttl`` seconds after insertion.
+
+    Entries are pickled snapshots, and every ``get`` returns fresh instances,
+    so concurrent requests never share (or mutate) the same model objects.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return ``(token, revocation counter when cached)`` or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, _, counter, snapshot = entry
+            if expires < time.monotonic():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+        return pickle.loads(snapshot), counter
+
+    def set(self, key, token, counter):
+        snapshot = pickle.dumps(token, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + self.ttl, token.user_id, counter, snapshot)
+            self._keys_by_user.setdefault(token.user_id, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+
+    def discard(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[1]
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE, settings.AUTH_TOKEN_CACHE_TTL)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        token = None
+        cached = token_cache.get(key)
+        if cached is not None:
+            token, counter = cached
+            # Another process may have deleted the token or changed the user.
+            if revocation_counter(token.user_id) != counter:
+                token_cache.discard(key)
+                token = None
+        if token is None:
+            try:
+                # Reverse one-to-ones are cached even when missing, so
+                # user.profile / user.preference never hit the database later.
+                token = Token.objects.select_related(
+                    'user', 'user__profile', 'user__preference'
+                ).get(key=key)
+            except Token.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            token_cache.set(key, token, revocation_counter(token.user_id))
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (token.user, token)
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from bookrec.images import refresh_variants
+
 class UserProfile(models.Model):
     PERSONALITY_TRAITS = [
         ('introvert', 'Introvert'),
@@ -13,6 +15,7 @@ class UserProfile(models.Model):
     
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized copies of avatar")
     bio = models.TextField(blank=True)
     
     # Reading stats
@@ -37,4 +40,8 @@ class UserProfile(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
-        return f"{self.user.username}'s profile"
\ No newline at end of file
+        return f"{self.user.username}'s profile"
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        refresh_variants(self, 'avatar', 'avatar_variants')
\ No newline at end of file
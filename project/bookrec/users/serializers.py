@@ -1,19 +1,24 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from bookrec.images import variant_urls
 from .models import UserProfile
 
 class UserProfileSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     email = serializers.CharField(source='user.email', read_only=True)
+    avatar_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = UserProfile
         fields = [
-            'id', 'username', 'email', 'avatar', 'bio', 
+            'id', 'username', 'email', 'avatar', 'avatar_variants', 'bio', 
             'books_read', 'currently_reading', 'dominant_trait',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
+    
+    def get_avatar_variants(self, obj):
+        return variant_urls(obj.avatar_variants, obj.avatar.storage, self.context.get('request'))
 
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -0,0 +1,30 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from recommendations.models import UserPreference
+from .authentication import revoke_cached_tokens, token_cache
+from .models import UserProfile
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    token_cache.discard(instance.key)
+    revoke_cached_tokens(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    token_cache.discard_user(instance.pk)
+    revoke_cached_tokens(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_save, sender=UserPreference)
+@receiver(post_delete, sender=UserPreference)
+def user_row_changed(sender, instance, **kwargs):
+    token_cache.discard_user(instance.user_id)
+    revoke_cached_tokens(instance.user_id)
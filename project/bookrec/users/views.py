@@ -14,8 +14,9 @@ class UserProfileView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
+        # request.user.profile is preloaded by CachedTokenAuthentication
         try:
-            profile = UserProfile.objects.get(user=request.user)
+            profile = request.user.profile
             serializer = UserProfileSerializer(profile)
             return Response(serializer.data)
         except UserProfile.DoesNotExist:
@@ -28,5 +29,7 @@ class UserProfileUpdateView(generics.UpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
+        # Not request.user.profile: the copy cached with the token may be stale,
+        # and saving it would overwrite changes made through other workers.
         profile, created = UserProfile.objects.get_or_create(user=self.request.user)
         return profile
\ No newline at end of file